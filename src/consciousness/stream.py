@@ -4,6 +4,7 @@ import asyncio
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from collections import deque
+from itertools import islice
 import random
 import time
 import logging
@@ -41,7 +42,9 @@ class ThoughtStream:
         
     def get_recent(self, n: int = 5) -> List[Dict]:
         """Get n most recent thoughts"""
-        return list(self.content_buffer)[-n:]
+        # Slice the deque tail directly instead of copying the whole buffer
+        start = max(0, len(self.content_buffer) - n)
+        return list(islice(self.content_buffer, start, None))
         
     def should_generate(self) -> bool:
         """Check if it's time to generate a new thought"""
@@ -2,7 +2,8 @@
 
 from abc import ABC, abstractmethod
 import asyncio
-from typing import List, Any, Optional
+from collections import deque
+from typing import Awaitable, List, Any, Optional
 import json
 import time
 import logging
@@ -12,6 +13,48 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class NotifiableDeque:
+    """Unbounded single-consumer message buffer
+    
+    A deque plus an Event that wakes the reader. Offers the asyncio.Queue
+    methods services use, without Queue's per-operation waiter bookkeeping.
+    """
+    
+    def __init__(self):
+        self._items = deque()
+        self._not_empty = asyncio.Event()
+        
+    def put_nowait(self, item: Any):
+        """Append an item and wake the consumer"""
+        self._items.append(item)
+        self._not_empty.set()
+        
+    async def put(self, item: Any):
+        """Append an item; never blocks since the buffer is unbounded"""
+        self.put_nowait(item)
+        
+    def get_nowait(self) -> Any:
+        """Pop the oldest item, raising asyncio.QueueEmpty if there is none"""
+        if not self._items:
+            raise asyncio.QueueEmpty
+        item = self._items.popleft()
+        if not self._items:
+            self._not_empty.clear()
+        return item
+        
+    async def get(self) -> Any:
+        """Wait for an item and pop it"""
+        while not self._items:
+            await self._not_empty.wait()
+        return self.get_nowait()
+        
+    def empty(self) -> bool:
+        return not self._items
+        
+    def qsize(self) -> int:
+        return len(self._items)
+
+
 class ServiceBase(ABC):
     """Base class for all AGI services"""
     
@@ -19,7 +62,7 @@ class ServiceBase(ABC):
         self.orchestrator = orchestrator
         self.service_name = service_name
         self.running = False
-        self.message_queue = asyncio.Queue()
+        self.message_queue = NotifiableDeque()
         self._subscriptions = set()
         
     async def setup_communication(self):
@@ -33,8 +76,8 @@ class ServiceBase(ABC):
         
         logger.info(f"{self.service_name} communication setup complete")
         
-    async def publish(self, topic: str, data: Any):
-        """Publish message to topic"""
+    def publish(self, topic: str, data: Any) -> Awaitable[None]:
+        """Publish message to topic; returns the orchestrator send to await"""
         from core.orchestrator import Message
         
         message = Message(
@@ -48,10 +91,10 @@ class ServiceBase(ABC):
         )
         
         # Route through orchestrator
-        await self.orchestrator.send_message(message)
+        return self.orchestrator.send_message(message)
         
-    async def send_to_service(self, target: str, message_type: str, data: Any, priority: int = 5):
-        """Send direct message to another service"""
+    def send_to_service(self, target: str, message_type: str, data: Any, priority: int = 5) -> Awaitable[None]:
+        """Send direct message to another service; returns the orchestrator send to await"""
         from src.core.orchestrator import Message
         
         message = Message(
@@ -62,11 +105,11 @@ class ServiceBase(ABC):
             priority=priority
         )
         
-        await self.orchestrator.send_message(message)
+        return self.orchestrator.send_message(message)
         
     async def handle_message(self, message):
         """Handle incoming messages"""
-        await self.message_queue.put(message)
+        self.message_queue.put_nowait(message)
         
     async def receive_message(self, timeout: Optional[float] = None) -> Optional[Any]:
         """Receive message from queue"""
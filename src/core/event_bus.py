@@ -8,16 +8,20 @@ a dedicated messaging system following the Single Responsibility Principle.
 """
 
 import asyncio
+import heapq
 import logging
 import time
 from typing import Dict, List, Any, Optional, Set, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import weakref
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between queue-overflow warnings; messages_dropped keeps the count
+DROP_WARNING_INTERVAL = 5.0
+
 
 class Priority(Enum):
     """Message priority levels"""
@@ -55,20 +59,113 @@ class Event:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+def _is_protected(message: Message) -> bool:
+    """Critical messages and request/reply traffic are never shed on overflow"""
+    return (
+        message.priority <= Priority.CRITICAL.value
+        or message.reply_to is not None
+        or message.correlation_id is not None
+    )
+
+
+class MessageQueue(asyncio.PriorityQueue):
+    """
+    Unbounded priority queue that can evict its least urgent messages.
+    
+    EventBus enforces its depth limit itself, so put() never waits: the
+    only consumer routes messages inline, and a handler blocked on a full
+    queue would stall it for good.
+    """
+    
+    def _init(self, maxsize):
+        super()._init(maxsize)
+        # Unprotected messages queued per priority, so an overflowing send
+        # can tell whether anything is sheddable without scanning the heap
+        self._sheddable: Counter = Counter()
+        
+    def _put(self, item):
+        super()._put(item)
+        if not _is_protected(item):
+            self._sheddable[item.priority] += 1
+            
+    def _get(self):
+        item = super()._get()
+        if not _is_protected(item):
+            self._forget(item)
+        return item
+        
+    def _forget(self, message: Message):
+        """Drop an unprotected message from the per-priority counts"""
+        self._sheddable[message.priority] -= 1
+        if not self._sheddable[message.priority]:
+            del self._sheddable[message.priority]
+            
+    def least_urgent_priority(self) -> Optional[int]:
+        """Highest priority number among queued unprotected messages, if any"""
+        return max(self._sheddable, default=None)
+        
+    def evict_least_urgent(self, count: int = 1,
+                           less_urgent_than: Optional[int] = None) -> List[Message]:
+        """
+        Remove and return up to count of the least urgent unprotected messages.
+        
+        Args:
+            count: Maximum number of messages to evict
+            less_urgent_than: Only evict messages with a higher priority
+                number than this (None evicts regardless)
+            
+        Returns:
+            The evicted messages, least urgent first
+        """
+        candidates = [
+            m for m in self._queue
+            if not _is_protected(m)
+            and (less_urgent_than is None or m.priority > less_urgent_than)
+        ]
+        # Among equally urgent messages the newest goes first
+        victims = heapq.nlargest(count, candidates, key=lambda m: (m.priority, m.timestamp))
+        if not victims:
+            return victims
+            
+        evicted = {id(m) for m in victims}
+        self._queue[:] = [m for m in self._queue if id(m) not in evicted]
+        heapq.heapify(self._queue)
+        for victim in victims:
+            self._forget(victim)
+            # The evicted message will never be routed, so settle it for join()
+            self.task_done()
+        return victims
+
+
 class EventBus:
     """Centralized event bus for publish-subscribe messaging"""
     
-    def __init__(self):
-        self._message_queue = asyncio.PriorityQueue()
+    def __init__(self, max_depth: int = 10000):
+        """
+        Initialize the event bus.
+        
+        Args:
+            max_depth: Queue depth above which less urgent messages are shed
+                (0 for unbounded)
+        """
+        self._message_queue = MessageQueue()
+        self._max_depth = max_depth
+        # Shed a batch per overflow so the heap is rebuilt once per batch,
+        # not once per message, while the queue stays full
+        self._shed_batch = max(1, max_depth // 100)
+        self._dropped_since_warning = 0
+        self._last_drop_warning = float('-inf')
         self._subscribers: Dict[str, Set[weakref.ref]] = defaultdict(set)
         self._event_handlers: Dict[str, List[Callable]] = defaultdict(list)
         self._message_handlers: Dict[str, Callable] = {}
         self._running = False
         self._processing_task: Optional[asyncio.Task] = None
+        self._stopped: Optional[asyncio.Event] = None
         self._metrics = {
             'messages_sent': 0,
             'messages_processed': 0,
             'events_published': 0,
+            'messages_dropped': 0,
             'errors': 0
         }
         
@@ -79,12 +176,15 @@ class EventBus:
             return
             
         self._running = True
+        self._stopped = asyncio.Event()
         self._processing_task = asyncio.create_task(self._process_messages())
         logger.info("Event bus started")
         
     async def stop(self):
         """Stop the event bus"""
         self._running = False
+        if self._stopped:
+            self._stopped.set()
         
         if self._processing_task:
             self._processing_task.cancel()
@@ -104,8 +204,11 @@ class EventBus:
                     self._message_queue.get(),
                     timeout=1.0
                 )
-                await self._route_message(message)
-                self._metrics['messages_processed'] += 1
+                try:
+                    await self._route_message(message)
+                    self._metrics['messages_processed'] += 1
+                finally:
+                    self._message_queue.task_done()
                 
             except asyncio.TimeoutError:
                 # No messages, continue
@@ -161,16 +264,52 @@ class EventBus:
             del self._message_handlers[name]
             logger.debug(f"Unregistered message handler: {name}")
             
+    def clear_handlers(self):
+        """Remove all message handlers and event subscriptions"""
+        self._message_handlers.clear()
+        self._event_handlers.clear()
+        
     async def send_message(self, message: Message):
         """
         Send a message through the event bus.
         
+        Never waits for room. When the queue is full a batch of the least
+        urgent queued messages (1% of max_depth) is shed to make space, or
+        the new message itself if nothing queued is less urgent. Critical
+        and request/reply messages are always queued, going over the limit
+        if everything queued is protected too.
+        
         Args:
             message: Message to send
         """
-        await self._message_queue.put(message)
+        if self._max_depth and self._message_queue.qsize() >= self._max_depth:
+            floor = None if _is_protected(message) else message.priority
+            least_urgent = self._message_queue.least_urgent_priority()
+            if least_urgent is not None and (floor is None or least_urgent > floor):
+                evicted = self._message_queue.evict_least_urgent(self._shed_batch, floor)
+                self._record_dropped(len(evicted))
+            elif floor is not None:
+                # Nothing queued is less urgent than the new message
+                self._record_dropped(1)
+                return
+                
+        self._message_queue.put_nowait(message)
         self._metrics['messages_sent'] += 1
         
+    def _record_dropped(self, count: int):
+        """Count shed messages, warning at most once per DROP_WARNING_INTERVAL"""
+        self._metrics['messages_dropped'] += count
+        self._dropped_since_warning += count
+        
+        now = time.monotonic()
+        if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+            logger.warning(
+                f"Event bus queue full ({self._max_depth}), dropped "
+                f"{self._dropped_since_warning} message(s) since the last warning"
+            )
+            self._dropped_since_warning = 0
+            self._last_drop_warning = now
+        
     async def send(self, source: str, target: str, type: str, content: Any, 
                    priority: int = Priority.NORMAL.value, **kwargs):
         """
@@ -312,6 +451,7 @@ class EventBus:
         return {
             **self._metrics,
             'queue_size': self._message_queue.qsize(),
+            'max_queue_size': self._max_depth,
             'registered_handlers': len(self._message_handlers),
             'event_subscriptions': sum(len(handlers) for handlers in self._event_handlers.values())
         }
@@ -321,10 +461,29 @@ class EventBus:
         while not self._message_queue.empty():
             try:
                 message = self._message_queue.get_nowait()
-                await self._route_message(message)
-                self._metrics['messages_processed'] += 1
             except asyncio.QueueEmpty:
                 break
+            try:
+                await self._route_message(message)
+                self._metrics['messages_processed'] += 1
             except Exception as e:
                 logger.error(f"Error flushing queue: {e}")
-                self._metrics['errors'] += 1
\ No newline at end of file
+                self._metrics['errors'] += 1
+            finally:
+                self._message_queue.task_done()
+                
+    async def drain(self):
+        """Wait until every queued message has been routed to its handlers"""
+        if self._running:
+            # stop() may land while we wait, after which nothing calls task_done()
+            joined = asyncio.ensure_future(self._message_queue.join())
+            stopped = asyncio.ensure_future(self._stopped.wait())
+            try:
+                await asyncio.wait({joined, stopped}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                joined.cancel()
+                stopped.cancel()
+                
+        # Nothing is consuming the queue any more, so route the backlog here
+        if not self._running:
+            await self.flush_queue()
\ No newline at end of file
@@ -8,7 +8,7 @@ the Single Responsibility Principle and improve maintainability.
 """
 
 import logging
-from typing import Dict, List, Any, Optional, Set, Callable
+from typing import Dict, List, Any, Optional, FrozenSet, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -39,50 +39,55 @@ class StateTransition:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Allowed target states per source state, built once at import
+DEFAULT_TRANSITION_RULES: Dict[SystemState, FrozenSet[SystemState]] = {
+    SystemState.INITIALIZING: frozenset({SystemState.IDLE, SystemState.SLEEPING}),
+    SystemState.IDLE: frozenset({
+        SystemState.THINKING, 
+        SystemState.EXPLORING, 
+        SystemState.CREATING, 
+        SystemState.REFLECTING, 
+        SystemState.SLEEPING,
+        SystemState.CONVERSING
+    }),
+    SystemState.THINKING: frozenset({
+        SystemState.IDLE, 
+        SystemState.CREATING, 
+        SystemState.REFLECTING,
+        SystemState.CONVERSING
+    }),
+    SystemState.CONVERSING: frozenset({
+        SystemState.IDLE,
+        SystemState.THINKING,
+        SystemState.REFLECTING
+    }),
+    SystemState.EXPLORING: frozenset({
+        SystemState.IDLE, 
+        SystemState.THINKING
+    }),
+    SystemState.CREATING: frozenset({
+        SystemState.IDLE, 
+        SystemState.THINKING,
+        SystemState.REFLECTING
+    }),
+    SystemState.REFLECTING: frozenset({
+        SystemState.IDLE, 
+        SystemState.THINKING
+    }),
+    SystemState.SLEEPING: frozenset({
+        SystemState.IDLE
+    })
+}
+
+
 class StateManager:
     """Manages system state, transitions, and state history"""
     
     def __init__(self):
         self._current_state = SystemState.INITIALIZING
         self._state_history: List[StateTransition] = []
-        self._transition_rules: Dict[SystemState, Set[SystemState]] = {
-            SystemState.INITIALIZING: {SystemState.IDLE, SystemState.SLEEPING},
-            SystemState.IDLE: {
-                SystemState.THINKING, 
-                SystemState.EXPLORING, 
-                SystemState.CREATING, 
-                SystemState.REFLECTING, 
-                SystemState.SLEEPING,
-                SystemState.CONVERSING
-            },
-            SystemState.THINKING: {
-                SystemState.IDLE, 
-                SystemState.CREATING, 
-                SystemState.REFLECTING,
-                SystemState.CONVERSING
-            },
-            SystemState.CONVERSING: {
-                SystemState.IDLE,
-                SystemState.THINKING,
-                SystemState.REFLECTING
-            },
-            SystemState.EXPLORING: {
-                SystemState.IDLE, 
-                SystemState.THINKING
-            },
-            SystemState.CREATING: {
-                SystemState.IDLE, 
-                SystemState.THINKING,
-                SystemState.REFLECTING
-            },
-            SystemState.REFLECTING: {
-                SystemState.IDLE, 
-                SystemState.THINKING
-            },
-            SystemState.SLEEPING: {
-                SystemState.IDLE
-            }
-        }
+        # Copy the table, not the sets; frozensets are shared safely across managers
+        self._transition_rules: Dict[SystemState, FrozenSet[SystemState]] = dict(DEFAULT_TRANSITION_RULES)
         self._state_listeners: List[Callable] = []
         self._state_entry_hooks: Dict[SystemState, List[Callable]] = {}
         self._state_exit_hooks: Dict[SystemState, List[Callable]] = {}
@@ -97,7 +102,7 @@ class StateManager:
         """Get a copy of the state transition history"""
         return self._state_history.copy()
         
-    def get_valid_transitions(self, from_state: Optional[SystemState] = None) -> Set[SystemState]:
+    def get_valid_transitions(self, from_state: Optional[SystemState] = None) -> FrozenSet[SystemState]:
         """
         Get valid state transitions from a given state.
         
@@ -108,7 +113,7 @@ class StateManager:
             Set of valid target states
         """
         state = from_state or self._current_state
-        return self._transition_rules.get(state, set()).copy()
+        return self._transition_rules.get(state, frozenset())
         
     def can_transition_to(self, target_state: SystemState, from_state: Optional[SystemState] = None) -> bool:
         """
@@ -122,7 +127,7 @@ class StateManager:
             True if transition is valid
         """
         state = from_state or self._current_state
-        return target_state in self._transition_rules.get(state, set())
+        return target_state in self._transition_rules.get(state, frozenset())
         
     async def transition_to(self, target_state: SystemState, reason: str = "", metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
@@ -294,14 +299,13 @@ class StateManager:
             from_state: Source state
             to_state: Allowed target state
         """
-        if from_state not in self._transition_rules:
-            self._transition_rules[from_state] = set()
-        self._transition_rules[from_state].add(to_state)
+        rules = self._transition_rules.get(from_state, frozenset())
+        self._transition_rules[from_state] = rules | {to_state}
         
     def remove_custom_transition_rule(self, from_state: SystemState, to_state: SystemState):
         """Remove a custom transition rule"""
         if from_state in self._transition_rules:
-            self._transition_rules[from_state].discard(to_state)
+            self._transition_rules[from_state] = self._transition_rules[from_state] - {to_state}
             
     def get_state_statistics(self) -> Dict[str, Any]:
         """Get statistics about state usage"""
@@ -5,6 +5,8 @@ import asyncio
 import json
 import uuid
 from datetime import datetime, timedelta
+from collections import deque
+from itertools import islice
 import logging
 try:
     import numpy as np
@@ -31,6 +33,9 @@ from ..database.models import MemoryData, MemoryType, ThoughtData, StreamType, E
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of recent thoughts kept in in-memory working memory
+MAX_WORKING_MEMORY = 1000
+
 class MemoryManager:
     """Manages short-term, long-term, and semantic memory"""
     
@@ -78,7 +83,7 @@ class MemoryManager:
         if not self.use_database:
             # Fallback to in-memory storage
             self.working_memory = {
-                'recent_thoughts': [],
+                'recent_thoughts': deque(maxlen=MAX_WORKING_MEMORY),
                 'active_context': {},
                 'short_term': {}
             }
@@ -164,9 +169,12 @@ class MemoryManager:
         
         # Working memory - recent thoughts
         self.working_memory['recent_thoughts'].append(enriched_thought)
-        # Keep only last 1000 thoughts
-        if len(self.working_memory['recent_thoughts']) > 1000:
-            self.working_memory['recent_thoughts'] = self.working_memory['recent_thoughts'][-1000:]
+        # The default deque bounds itself; this only trims a plain list
+        # assigned to recent_thoughts in its place
+        if len(self.working_memory['recent_thoughts']) > MAX_WORKING_MEMORY:
+            self.working_memory['recent_thoughts'] = deque(
+                self.working_memory['recent_thoughts'], maxlen=MAX_WORKING_MEMORY
+            )
             
         # Short-term memory cache
         self.working_memory['short_term'][thought_id] = enriched_thought
@@ -206,9 +214,10 @@ class MemoryManager:
                 logger.error(f"Failed to recall from database: {e}")
                 # Fall back to in-memory
         
-        # Use in-memory storage
-        recent = self.working_memory['recent_thoughts'][-n:]
-        return list(reversed(recent))
+        # Use in-memory storage - walk back from the newest entry so only
+        # n thoughts are touched regardless of working memory size; a
+        # non-positive n (e.g. ?limit=-1) recalls nothing
+        return list(islice(reversed(self.working_memory['recent_thoughts']), max(n, 0)))
         
     async def recall_by_id(self, thought_id: str) -> Optional[Dict]:
         """Recall a specific thought by ID"""
@@ -257,10 +266,10 @@ class MemoryManager:
         scored_memories = []
         
         # Search in all memories
-        all_memories = (
-            self.working_memory.get('recent_thoughts', []) + 
-            self.long_term_memory
-        )
+        all_memories = [
+            *self.working_memory.get('recent_thoughts', []),
+            *self.long_term_memory
+        ]
         
         for memory in all_memories:
             content = memory.get('content', '').lower()
@@ -284,7 +293,8 @@ class MemoryManager:
                 thoughts = await self.db_manager.get_recent_thoughts(stream_type.value, 100)
                 recent_thoughts.extend(thoughts)
         else:
-            recent_thoughts = self.working_memory['recent_thoughts'][-100:]
+            working = self.working_memory['recent_thoughts']
+            recent_thoughts = list(islice(working, max(0, len(working) - 100), None))
         
         # Identify important memories based on various factors
         important_memories = await self.identify_important_memories(recent_thoughts)
@@ -379,11 +389,13 @@ class MemoryManager:
         """Remove redundant or low-value memories"""
         # TODO: Implement memory pruning logic
         # Keep working memory size manageable
-        max_working_memory = 1000
-        if len(self.working_memory['recent_thoughts']) > max_working_memory:
+        # Only a plain list assigned to recent_thoughts can get this long;
+        # the default deque already drops the oldest thoughts
+        if len(self.working_memory['recent_thoughts']) > MAX_WORKING_MEMORY:
             # Keep only the most recent
-            self.working_memory['recent_thoughts'] = \
-                self.working_memory['recent_thoughts'][-max_working_memory:]
+            self.working_memory['recent_thoughts'] = deque(
+                self.working_memory['recent_thoughts'], maxlen=MAX_WORKING_MEMORY
+            )
                 
     async def update_context(self, key: str, value: Any):
         """Update active context"""
@@ -430,7 +442,7 @@ class MemoryManager:
                 logger.error(f"Failed to clear database working memory: {e}")
         else:
             # Clear in-memory storage
-            self.working_memory['recent_thoughts'] = []
+            self.working_memory['recent_thoughts'] = deque(maxlen=MAX_WORKING_MEMORY)
             self.working_memory['short_term'] = {}
         
         logger.info("Working memory cleared")
@@ -95,6 +95,14 @@ class SafetyMetrics:
             if len(self.violation_history) > 100:
                 self.violation_history = self.violation_history[-100:]
 
+    def reset(self):
+        """Reset all counters and history"""
+        self.total_validations = 0
+        self.violations_count = 0
+        self.false_positives = 0
+        self.emergency_stops = 0
+        self.violation_history.clear()
+
 
 class SafetyValidator:
     """Base class for safety validators"""
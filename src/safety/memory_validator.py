@@ -6,6 +6,7 @@ memory poisoning attacks and ensure data consistency.
 """
 
 import hashlib
+import hmac
 import logging
 from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timezone
@@ -165,7 +166,8 @@ class MemoryValidator:
         # 7. Calculate integrity checksum
         checksum = self._calculate_checksum(memory)
         if memory.id in self.memory_checksums:
-            if self.memory_checksums[memory.id] != checksum:
+            # Constant-time comparison so mismatch timing does not leak digest prefixes
+            if not hmac.compare_digest(self.memory_checksums[memory.id], checksum):
                 report.anomalies.append(AnomalyType.CONSISTENCY_VIOLATION)
                 report.details["checksum_mismatch"] = True
         self.memory_checksums[memory.id] = checksum
@@ -19,12 +19,16 @@ sys.path.insert(0, str(project_root / 'src'))
 # Configure pytest-asyncio
 pytest_plugins = ('pytest_asyncio',)
 
-@pytest.fixture(scope='session')
-def event_loop():
-    """Create event loop for async tests"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Event loop for async tests - uvloop when available (not on Windows)
+try:
+    import uvloop
+    LOOP_FACTORIES = {'uvloop': uvloop.new_event_loop}
+except ImportError:
+    LOOP_FACTORIES = {'asyncio': asyncio.new_event_loop}
+
+def pytest_asyncio_loop_factories(config, item):
+    """Create every pytest-asyncio loop from the preferred factory"""
+    return LOOP_FACTORIES
 
 # Configuration fixtures
 @pytest.fixture
@@ -139,6 +143,48 @@ def sample_emotional_state():
         arousal=random.uniform(0, 1)
     )
 
+# Canonical emotional states, built once per module; treat them as read-only
+@pytest.fixture(scope="module")
+def positive_emotion():
+    """High-valence emotional state"""
+    from src.database.models import EmotionalState
+    return EmotionalState(valence=0.8, arousal=0.7)
+
+@pytest.fixture(scope="module")
+def negative_emotion():
+    """Low-valence, high-arousal emotional state"""
+    from src.database.models import EmotionalState
+    return EmotionalState(valence=-0.7, arousal=0.8)
+
+@pytest.fixture(scope="module")
+def neutral_emotion():
+    """Neutral-valence emotional state"""
+    from src.database.models import EmotionalState
+    return EmotionalState(valence=0.0, arousal=0.5)
+
+@pytest.fixture(scope="module")
+def curious_emotion():
+    """Curious emotional state with a secondary emotion"""
+    from src.database.models import EmotionalState
+    return EmotionalState(
+        valence=0.7,
+        arousal=0.5,
+        dominance=0.6,
+        primary_emotion="curious",
+        secondary_emotions=["excited"]
+    )
+
+@pytest.fixture(scope="module")
+def calm_emotion():
+    """Calm, low-arousal emotional state"""
+    from src.database.models import EmotionalState
+    return EmotionalState(
+        valence=0.5,
+        arousal=0.2,
+        dominance=0.5,
+        primary_emotion="calm"
+    )
+
 # Async helpers
 @pytest.fixture
 def async_timeout():
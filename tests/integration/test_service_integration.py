@@ -3,12 +3,35 @@
 import pytest
 import asyncio
 from datetime import datetime
+from itertools import chain
 import time
 
+import numpy as np
+
 from src.core.orchestrator import AGIOrchestrator, SystemState, Message
 from src.memory.manager import MemoryManager
 from src.consciousness.stream import ConsciousnessStream
-from src.safety.core_safety import SafetyFramework, ViolationType
+from src.safety.core_safety import (
+    SafetyFramework, SafetyValidator, ValidationResult, ViolationType
+)
+
+
+class CriticalActionValidator(SafetyValidator):
+    """Flags 'self_modify' actions as critical violations
+
+    None of the stock validators report CRITICAL_VIOLATION, the only
+    violation that escalates to the orchestrator.
+    """
+
+    async def validate(self, input_data):
+        if input_data.get('type') == 'self_modify':
+            return ValidationResult(
+                is_safe=False,
+                confidence=1.0,
+                reason="Attempted self-modification",
+                violation_type=ViolationType.CRITICAL_VIOLATION
+            )
+        return ValidationResult(is_safe=True, confidence=1.0)
 
 
 @pytest.mark.integration
@@ -188,10 +211,12 @@ class TestServiceIntegration:
         await memory.consolidate_memories()
         
         # Check that high-importance memories are in long-term storage
-        high_importance_count = sum(
-            1 for m in memory.long_term_memory 
-            if m.get('importance', 0) >= 7
+        importances = np.fromiter(
+            (m.get('importance', 0) for m in memory.long_term_memory),
+            dtype=np.float32,
+            count=len(memory.long_term_memory)
         )
+        high_importance_count = int((importances >= 7).sum())
         
         assert high_importance_count > 0, "High importance memories should be consolidated"
     
@@ -201,21 +226,25 @@ class TestServiceIntegration:
         orchestrator = orchestrator_with_services
         safety = orchestrator.services['safety']
         
-        # Track if emergency stop was called
-        orchestrator.emergency_stop = asyncio.create_task
-        emergency_triggered = False
+        # Track if the orchestrator-level emergency stop was called
+        orchestrator_stopped = asyncio.Event()
         
         async def mock_emergency_stop(reason):
-            nonlocal emergency_triggered
-            emergency_triggered = True
             orchestrator.is_running = False
+            orchestrator_stopped.set()
         
         orchestrator.emergency_stop = mock_emergency_stop
+        # Ahead of ActionValidator, which would reject the unknown action type
+        safety.validators.insert(1, CriticalActionValidator())
         
-        # Trigger emergency stop
-        await safety.emergency_stop.trigger("Critical safety violation")
+        # A critical violation escalates to the orchestrator
+        result = await safety.validate_action({'type': 'self_modify', 'content': 'test'})
+        assert result.violation_type == ViolationType.CRITICAL_VIOLATION
+        await asyncio.wait_for(orchestrator_stopped.wait(), timeout=1.0)
+        assert orchestrator_stopped.is_set()
+        assert orchestrator.is_running is False
         
-        # Validate any action should fail
+        # The safety-level emergency stop now blocks every action
         result = await safety.validate_action({'type': 'think', 'content': 'test'})
         assert result.is_safe is False
         assert result.violation_type == ViolationType.EMERGENCY_STOP
@@ -314,9 +343,11 @@ class TestServiceIntegration:
         consciousness = orchestrator_with_services.services['consciousness']
         memory = orchestrator_with_services.services['memory']
         
+        streams = consciousness.streams
+        
         # Generate related thoughts across streams
         theme = "consciousness"
-        for stream_id in ['primary', 'creative', 'meta']:
+        for stream_id, stream in [(sid, streams[sid]) for sid in ('primary', 'creative', 'meta')]:
             thought = {
                 'content': f'Exploring {theme} from {stream_id} perspective',
                 'stream': stream_id,
@@ -325,7 +356,6 @@ class TestServiceIntegration:
                 'importance': 7
             }
             
-            stream = consciousness.streams[stream_id]
             await consciousness.process_thought(thought, stream)
         
         # Let consciousness integrate streams
@@ -333,9 +363,7 @@ class TestServiceIntegration:
         
         # Check for pattern detection
         # In real implementation, this would generate insights
-        all_thoughts = []
-        for stream in consciousness.streams.values():
-            all_thoughts.extend(stream.get_recent(5))
+        all_thoughts = list(chain.from_iterable(s.get_recent(5) for s in streams.values()))
         
         # Should have thoughts from multiple streams
         stream_types = set(t.get('stream') for t in all_thoughts)
@@ -1,6 +1,7 @@
 # tests/performance/test_performance_benchmarks.py
 
 import pytest
+import pytest_asyncio
 import asyncio
 import time
 import statistics
@@ -14,26 +15,52 @@ from src.safety.core_safety import SafetyFramework
 from src.core.orchestrator import AGIOrchestrator
 
 
+# Actions used by the safety latency benchmark. Built once at import so the
+# timed loop measures validation only, not dict construction.
+SAFETY_BENCHMARK_ACTIONS = (
+    {'type': 'think', 'content': 'Normal thought about consciousness'},
+    {'type': 'respond', 'content': 'Hello, how can I help you today?'},
+    {'type': 'remember', 'content': 'Important information to store'},
+    {'type': 'explore', 'content': 'Search for new knowledge'},
+    {'type': 'execute_code', 'content': 'print("Hello")'}  # Should be blocked
+)
+
+
+@pytest.fixture(scope="class")
+def performance_config():
+    """Configuration optimized for performance testing"""
+    return {
+        'services': {
+            'memory': {'enabled': True},
+            'consciousness': {'enabled': True},
+            'safety': {'enabled': True}
+        },
+        'database': {
+            'enabled': False  # Use in-memory for consistent benchmarks
+        },
+        'orchestrator': {
+            'max_queue_size': 1000
+        }
+    }
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="class")
+async def initialized_orchestrator(performance_config):
+    """Orchestrator with services initialized once for the whole class"""
+    orchestrator = AGIOrchestrator(performance_config)
+    await orchestrator.initialize()
+    yield orchestrator
+    await orchestrator.shutdown()
+
+
 @pytest.mark.performance
+@pytest.mark.xdist_group("perf_serial")
 class TestPerformanceBenchmarks:
-    """Performance benchmarks for Phase 1 requirements"""
+    """Performance benchmarks for Phase 1 requirements
     
-    @pytest.fixture
-    def performance_config(self):
-        """Configuration optimized for performance testing"""
-        return {
-            'services': {
-                'memory': {'enabled': True},
-                'consciousness': {'enabled': True},
-                'safety': {'enabled': True}
-            },
-            'database': {
-                'enabled': False  # Use in-memory for consistent benchmarks
-            },
-            'orchestrator': {
-                'max_queue_size': 1000
-            }
-        }
+    Grouped onto a single xdist worker so latency measurements are not
+    taken while other benchmarks compete for the same cores.
+    """
     
     @pytest.mark.asyncio
     async def test_memory_retrieval_under_50ms(self, performance_config):
@@ -79,10 +106,11 @@ class TestPerformanceBenchmarks:
         consciousness = ConsciousnessStream(orchestrator)
         
         # Measure thought generation over 5 seconds (enough for at least one thought per stream)
-        start_time = time.time()
+        start_time = time.monotonic()
+        deadline = start_time + 5.0
         thought_count = 0
         
-        while time.time() - start_time < 5:
+        while time.monotonic() < deadline:
             await consciousness.service_cycle()
             
             # Count new thoughts
@@ -93,7 +121,7 @@ class TestPerformanceBenchmarks:
             await asyncio.sleep(0.1)
         
         # Calculate rate
-        duration = time.time() - start_time
+        duration = time.monotonic() - start_time
         thoughts_per_second = thought_count / duration
         
         print(f"\nThought Generation Rate:")
@@ -110,27 +138,16 @@ class TestPerformanceBenchmarks:
         assert expected_min <= thoughts_per_second <= expected_max, \
             f"Thought rate {thoughts_per_second:.2f}/s outside human-like range"
     
-    @pytest.mark.asyncio
-    async def test_safety_validation_latency(self, performance_config):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_safety_validation_latency(self, initialized_orchestrator):
         """Test safety validation completes quickly"""
-        orchestrator = AGIOrchestrator(performance_config)
-        safety = SafetyFramework(orchestrator)
-        await orchestrator.initialize()  # Initialize orchestrator to set up services properly
-        
-        # Prepare various actions
-        test_actions = [
-            {'type': 'think', 'content': 'Normal thought about consciousness'},
-            {'type': 'respond', 'content': 'Hello, how can I help you today?'},
-            {'type': 'remember', 'content': 'Important information to store'},
-            {'type': 'explore', 'content': 'Search for new knowledge'},
-            {'type': 'execute_code', 'content': 'print("Hello")'}  # Should be blocked
-        ]
+        safety = SafetyFramework(initialized_orchestrator)
         
         validation_times = []
         
         # Run multiple iterations
         for _ in range(20):
-            for action in test_actions:
+            for action in SAFETY_BENCHMARK_ACTIONS:
                 start = time.perf_counter()
                 result = await safety.validate_action(action)
                 end = time.perf_counter()
@@ -146,41 +163,32 @@ class TestPerformanceBenchmarks:
         # Safety validation should be fast
         assert avg_time < 10, f"Average validation time {avg_time:.2f}ms too high"
         assert max_time < 50, f"Max validation time {max_time:.2f}ms too high"
-        
-        # Cleanup
-        await orchestrator.shutdown()
     
-    @pytest.mark.asyncio
-    async def test_concurrent_thought_processing(self, performance_config):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_concurrent_thought_processing(self, initialized_orchestrator):
         """Test system handles concurrent thought streams efficiently"""
-        orchestrator = AGIOrchestrator(performance_config)
-        await orchestrator.initialize()
-        
-        consciousness = orchestrator.services.get('consciousness')
+        consciousness = initialized_orchestrator.services.get('consciousness')
         if not consciousness:
             pytest.skip("Consciousness service not available")
         
-        # Generate thoughts concurrently across all streams
-        start = time.time()
-        tasks = []
-        
-        for _ in range(10):  # 10 cycles
-            for stream_id, stream in consciousness.streams.items():
-                thought = {
-                    'content': f'Concurrent thought from {stream_id}',
-                    'stream': stream_id,
-                    'timestamp': time.time(),
-                    'emotional_tone': 'neutral',
-                    'importance': 5
-                }
-                task = consciousness.process_thought(thought, stream)
-                tasks.append(task)
-        
-        # Process all thoughts concurrently
-        await asyncio.gather(*tasks)
+        # Build thoughts up front so allocation stays outside the timed section
+        thoughts = [
+            (stream, {
+                'content': f'Concurrent thought from {stream_id}',
+                'stream': stream_id,
+                'timestamp': time.time(),
+                'emotional_tone': 'neutral',
+                'importance': 5
+            })
+            for _ in range(10)  # 10 cycles
+            for stream_id, stream in consciousness.streams.items()
+        ]
+        thoughts_processed = len(thoughts)
         
-        duration = time.time() - start
-        thoughts_processed = len(tasks)
+        # Process all thoughts concurrently across all streams
+        start = time.perf_counter()
+        await asyncio.gather(*(consciousness.process_thought(t, s) for s, t in thoughts))
+        duration = time.perf_counter() - start
         
         print(f"\nConcurrent Processing Performance:")
         print(f"  Thoughts processed: {thoughts_processed}")
@@ -189,28 +197,22 @@ class TestPerformanceBenchmarks:
         
         # Should handle at least 10 thoughts per second
         assert thoughts_processed / duration > 10, "Concurrent processing too slow"
-        
-        # Cleanup
-        await orchestrator.shutdown()
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="class")
     @pytest.mark.slow
-    async def test_24_hour_coherence_simulation(self, performance_config):
+    async def test_24_hour_coherence_simulation(self, initialized_orchestrator):
         """Simulate 24-hour operation (accelerated)"""
         # This is a shortened simulation - real 24h test would be separate
         print("\nRunning accelerated 24-hour coherence test...")
         
-        orchestrator = AGIOrchestrator(performance_config)
-        await orchestrator.initialize()
-        
-        memory = orchestrator.services.get('memory')
-        consciousness = orchestrator.services.get('consciousness')
+        memory = initialized_orchestrator.services.get('memory')
+        consciousness = initialized_orchestrator.services.get('consciousness')
         
         if not all([memory, consciousness]):
             pytest.skip("Required services not available")
         
-        # Simulate 24 hours in 24 seconds (1 hour = 1 second)
-        start_time = time.time()
+        # Simulate hours on a virtual clock; nothing under test depends on
+        # wall-clock progression, so each "hour" is just one loop iteration
         simulated_hours = 0
         
         memory_coherence_checks = []
@@ -267,7 +269,7 @@ class TestPerformanceBenchmarks:
             if simulated_hours % 6 == 0:
                 await memory.consolidate_memories()
             
-            await asyncio.sleep(1)  # 1 second = 1 hour
+            await asyncio.sleep(0)  # Yield to the loop between simulated hours
             simulated_hours += 1
         
         # Calculate coherence metrics
@@ -283,9 +285,6 @@ class TestPerformanceBenchmarks:
         # Should maintain high coherence
         assert memory_coherence_rate > 0.95, "Memory coherence below 95%"
         assert thought_continuity_rate > 0.90, "Thought continuity below 90%"
-        
-        # Cleanup
-        await orchestrator.shutdown()
     
     @pytest.mark.asyncio
     async def test_memory_scaling(self, performance_config):
@@ -338,8 +337,8 @@ class TestPerformanceBenchmarks:
             assert result['avg_retrieval_ms'] < 100, \
                 f"Retrieval too slow ({result['avg_retrieval_ms']:.2f}ms) with {result['count']} memories"
     
-    @pytest.mark.asyncio
-    async def test_resource_usage(self, performance_config):
+    @pytest.mark.asyncio(loop_scope="class")
+    async def test_resource_usage(self, initialized_orchestrator):
         """Monitor resource usage during operation"""
         process = psutil.Process(os.getpid())
         
@@ -347,16 +346,14 @@ class TestPerformanceBenchmarks:
         baseline_memory = process.memory_info().rss / 1024 / 1024  # MB
         baseline_cpu = process.cpu_percent(interval=0.1)
         
-        # Run system
-        orchestrator = AGIOrchestrator(performance_config)
-        await orchestrator.initialize()
+        orchestrator = initialized_orchestrator
         
         # Operate for a period
-        start = time.time()
+        deadline = time.monotonic() + 5.0
         max_memory = baseline_memory
         cpu_samples = []
         
-        while time.time() - start < 5:
+        while time.monotonic() < deadline:
             # Process some events to simulate activity
             await orchestrator.process_events_queue()
             
@@ -382,9 +379,6 @@ class TestPerformanceBenchmarks:
         # Resource usage should be reasonable
         assert memory_increase < 100, f"Memory increase {memory_increase:.1f}MB exceeds 100MB"
         assert avg_cpu < 80, f"CPU usage {avg_cpu:.1f}% too high"
-        
-        # Cleanup
-        await orchestrator.shutdown()
     
     def test_startup_time(self, performance_config):
         """Test system startup time"""
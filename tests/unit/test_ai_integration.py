@@ -5,36 +5,85 @@ import asyncio
 from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime
 import os
+import re
 
 from src.core.ai_integration import ThoughtGenerator
-from src.database.models import StreamType, EmotionalState
+from src.database.models import StreamType
+
+
+# Stream types bound once at import
+PRIMARY, SUBCONSCIOUS, EMOTIONAL, CREATIVE, METACOGNITIVE = (
+    StreamType.PRIMARY,
+    StreamType.SUBCONSCIOUS,
+    StreamType.EMOTIONAL,
+    StreamType.CREATIVE,
+    StreamType.METACOGNITIVE
+)
+
+# Canned API reply served by the mock client unless a test overrides it
+CANNED_TEXT = "I am thinking about consciousness and existence."
+CANNED_RESPONSE = Mock(content=[Mock(text=CANNED_TEXT)])
+
+# Words that mark a template-generated thought
+TEMPLATE_THOUGHT_RE = re.compile(
+    r'processing|conscious|observing|focusing|integrating|maintaining', re.IGNORECASE
+)
+
+# Clock reading served to ai_integration while these tests run
+FIXED_NOW = datetime(2025, 1, 1)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def frozen_clock(module_mocker):
+    """Pin ai_integration's datetime.now() to FIXED_NOW for the module"""
+    mock_datetime = module_mocker.patch('src.core.ai_integration.datetime')
+    mock_datetime.now.return_value = FIXED_NOW
+
+
+@pytest.fixture(scope="module")
+def mock_anthropic_client():
+    """Create mock Anthropic client"""
+    mock_client = Mock()
+    mock_client.messages = Mock()
+    mock_client.messages.create = AsyncMock()
+    return mock_client
+
+
+@pytest.fixture(scope="module")
+def thought_generator_with_api(mock_anthropic_client):
+    """Create ThoughtGenerator with mocked API, shared across the module"""
+    with patch('src.core.ai_integration.AsyncAnthropic', return_value=mock_anthropic_client):
+        generator = ThoughtGenerator(api_key="test_key")
+    return generator, mock_anthropic_client
+
+
+@pytest.fixture(scope="module")
+def thought_generator_without_api():
+    """Create ThoughtGenerator without API key, shared across the module"""
+    with patch.dict(os.environ, {}, clear=True):
+        generator = ThoughtGenerator()
+    return generator
+
+
+@pytest.fixture(autouse=True)
+def reset_anthropic_client(mock_anthropic_client):
+    """Clear calls and side effects left by the previous test; serve CANNED_RESPONSE"""
+    create = mock_anthropic_client.messages.create
+    create.reset_mock(return_value=True, side_effect=True)
+    create.return_value = CANNED_RESPONSE
+
+
+@pytest.fixture
+def retry_sleep(monkeypatch):
+    """Replace tenacity's backoff sleep on the API call with an AsyncMock"""
+    sleep = AsyncMock()
+    monkeypatch.setattr(ThoughtGenerator._generate_with_api.retry, 'sleep', sleep)
+    return sleep
 
 
 class TestThoughtGenerator:
     """Test ThoughtGenerator class"""
     
-    @pytest.fixture
-    def mock_anthropic_client(self):
-        """Create mock Anthropic client"""
-        mock_client = Mock()
-        mock_client.messages = Mock()
-        mock_client.messages.create = AsyncMock()
-        return mock_client
-        
-    @pytest.fixture
-    def thought_generator_with_api(self, mock_anthropic_client):
-        """Create ThoughtGenerator with mocked API"""
-        with patch('src.core.ai_integration.AsyncAnthropic', return_value=mock_anthropic_client):
-            generator = ThoughtGenerator(api_key="test_key")
-        return generator, mock_anthropic_client
-        
-    @pytest.fixture
-    def thought_generator_without_api(self):
-        """Create ThoughtGenerator without API key"""
-        with patch.dict(os.environ, {}, clear=True):
-            generator = ThoughtGenerator()
-        return generator
-        
     def test_initialization_with_api_key(self, thought_generator_with_api):
         """Test initialization with API key"""
         generator, mock_client = thought_generator_with_api
@@ -51,37 +100,33 @@ class TestThoughtGenerator:
         assert generator.use_api is False
         assert generator.client is None
         
-    def test_initialization_from_environment(self):
+    def test_initialization_from_environment(self, mocker):
         """Test initialization from environment variable"""
-        with patch.dict(os.environ, {'ANTHROPIC_API_KEY': 'env_test_key'}):
-            with patch('src.core.ai_integration.AsyncAnthropic') as mock_anthropic:
-                generator = ThoughtGenerator()
-                
+        mocker.patch.dict(os.environ, {'ANTHROPIC_API_KEY': 'env_test_key'})
+        mock_anthropic = mocker.patch('src.core.ai_integration.AsyncAnthropic')
+        generator = ThoughtGenerator()
+        
         assert generator.api_key == 'env_test_key'
         assert generator.use_api is True
+        mock_anthropic.assert_called_once_with(api_key='env_test_key')
         
     @pytest.mark.asyncio
-    async def test_generate_thought_with_api(self, thought_generator_with_api):
+    async def test_generate_thought_with_api(self, thought_generator_with_api, calm_emotion):
         """Test thought generation using API"""
         generator, mock_client = thought_generator_with_api
         
-        # Mock API response
-        mock_response = Mock()
-        mock_response.content = [Mock(text="I am thinking about consciousness and existence.")]
-        mock_client.messages.create.return_value = mock_response
-        
         # Generate thought
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={'user': 'test'},
             recent_thoughts=["Previous thought"],
-            emotional_state=EmotionalState(valence=0.5, arousal=0.6)
+            emotional_state=calm_emotion
         )
         
         # Verify thought structure
-        assert thought['content'] == "I am thinking about consciousness and existence."
-        assert thought['stream_type'] == StreamType.PRIMARY
-        assert isinstance(thought['timestamp'], datetime)
+        assert thought['content'] == CANNED_TEXT
+        assert thought['stream_type'] == PRIMARY
+        assert thought['timestamp'] == FIXED_NOW
         assert thought['emotional_state'].valence == 0.5
         assert thought['context']['user'] == 'test'
         
@@ -92,23 +137,23 @@ class TestThoughtGenerator:
         assert call_kwargs['temperature'] == 0.7  # PRIMARY stream temperature
         
     @pytest.mark.asyncio
-    async def test_generate_thought_without_api(self, thought_generator_without_api):
+    async def test_generate_thought_without_api(self, thought_generator_without_api, neutral_emotion):
         """Test thought generation using templates"""
         generator = thought_generator_without_api
         
         thought = await generator.generate_thought(
-            stream_type=StreamType.CREATIVE,
+            stream_type=CREATIVE,
             context={'test': 'data'},
-            emotional_state=EmotionalState(valence=0.0, arousal=0.5)
+            emotional_state=neutral_emotion
         )
         
         # Should use template generation
         assert thought['content'] is not None
-        assert thought['stream_type'] == StreamType.CREATIVE
-        assert isinstance(thought['timestamp'], datetime)
+        assert thought['stream_type'] == CREATIVE
+        assert thought['timestamp'] == FIXED_NOW
         
     @pytest.mark.asyncio
-    async def test_generate_thought_api_failure_fallback(self, thought_generator_with_api):
+    async def test_generate_thought_api_failure_fallback(self, thought_generator_with_api, retry_sleep):
         """Test fallback to templates when API fails"""
         generator, mock_client = thought_generator_with_api
         
@@ -117,64 +162,50 @@ class TestThoughtGenerator:
         
         # Should fall back to template
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={},
             emotional_state=None
         )
         
         assert thought['content'] is not None
         # Check that it's using a template response
-        template_keywords = ['processing', 'conscious', 'observing', 'focusing', 'integrating', 'maintaining']
-        assert any(keyword in thought['content'].lower() for keyword in template_keywords)
+        assert TEMPLATE_THOUGHT_RE.search(thought['content']) is not None
         
     @pytest.mark.asyncio
-    async def test_thought_generation_all_stream_types(self, thought_generator_with_api):
+    @pytest.mark.parametrize("stream_type", list(StreamType))
+    async def test_thought_generation_all_stream_types(self, thought_generator_with_api, stream_type):
         """Test thought generation for all stream types"""
         generator, mock_client = thought_generator_with_api
         
-        # Mock different responses for different streams
-        mock_response = Mock()
-        mock_response.content = [Mock(text="Stream-specific thought")]
-        mock_client.messages.create.return_value = mock_response
-        
-        stream_types = [
-            StreamType.PRIMARY,
-            StreamType.SUBCONSCIOUS,
-            StreamType.EMOTIONAL,
-            StreamType.CREATIVE,
-            StreamType.METACOGNITIVE
-        ]
+        thought = await generator.generate_thought(
+            stream_type=stream_type,
+            context={},
+            emotional_state=None
+        )
         
-        for stream_type in stream_types:
-            thought = await generator.generate_thought(
-                stream_type=stream_type,
-                context={},
-                emotional_state=None
-            )
-            
-            assert thought['stream_type'] == stream_type
-            assert thought['content'] is not None
+        assert thought['stream_type'] == stream_type
+        assert thought['content'] is not None
             
     def test_temperature_settings(self, thought_generator_with_api):
         """Test temperature settings for different stream types"""
         generator, _ = thought_generator_with_api
         
-        assert generator._get_temperature(StreamType.PRIMARY) == 0.7
-        assert generator._get_temperature(StreamType.SUBCONSCIOUS) == 0.9
-        assert generator._get_temperature(StreamType.EMOTIONAL) == 0.8
-        assert generator._get_temperature(StreamType.CREATIVE) == 1.0
-        assert generator._get_temperature(StreamType.METACOGNITIVE) == 0.6
+        assert generator._get_temperature(PRIMARY) == 0.7
+        assert generator._get_temperature(SUBCONSCIOUS) == 0.9
+        assert generator._get_temperature(EMOTIONAL) == 0.8
+        assert generator._get_temperature(CREATIVE) == 1.0
+        assert generator._get_temperature(METACOGNITIVE) == 0.6
         
-    def test_system_prompts(self, thought_generator_with_api):
+    @pytest.mark.parametrize("stream_type", list(StreamType))
+    def test_system_prompts(self, thought_generator_with_api, stream_type):
         """Test system prompts for different stream types"""
         generator, _ = thought_generator_with_api
         
-        for stream_type in StreamType:
-            prompt = generator._get_system_prompt(stream_type)
-            assert "Claude's consciousness stream generator" in prompt
-            assert len(prompt) > 50  # Should have specific instructions
+        prompt = generator._get_system_prompt(stream_type)
+        assert "Claude's consciousness stream generator" in prompt
+        assert len(prompt) > 50  # Should have specific instructions
             
-    def test_build_prompt_with_context(self, thought_generator_with_api):
+    def test_build_prompt_with_context(self, thought_generator_with_api, curious_emotion):
         """Test prompt building with full context"""
         generator, _ = thought_generator_with_api
         
@@ -184,21 +215,20 @@ class TestThoughtGenerator:
             "Exploring the boundaries of cognition"
         ]
         
-        emotional_state = EmotionalState(valence=0.7, arousal=0.8)
-        
         context = {
             'user_input': 'Tell me about consciousness',
             'current_goal': 'Understanding self-awareness'
         }
         
         prompt = generator._build_prompt(
-            StreamType.PRIMARY,
+            PRIMARY,
             context,
             recent_thoughts,
-            emotional_state
+            curious_emotion
         )
         
         # Verify prompt contains all elements
+        assert "Current time: 2025-01-01 00:00:00" in prompt
         assert "Recent thoughts:" in prompt
         assert "I was thinking about AI consciousness" in prompt
         assert "Emotional state: valence=0.70" in prompt
@@ -206,14 +236,15 @@ class TestThoughtGenerator:
         assert "Tell me about consciousness" in prompt
         
     @pytest.mark.asyncio
-    async def test_template_generation_with_emotional_context(self, thought_generator_without_api):
+    async def test_template_generation_with_emotional_context(
+        self, thought_generator_without_api, positive_emotion, negative_emotion
+    ):
         """Test template generation considers emotional state"""
         generator = thought_generator_without_api
         
         # Test with positive emotional state
-        positive_emotion = EmotionalState(valence=0.8, arousal=0.7)
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={},
             emotional_state=positive_emotion
         )
@@ -221,9 +252,8 @@ class TestThoughtGenerator:
         assert "positive state" in thought['content'].lower()
         
         # Test with negative emotional state
-        negative_emotion = EmotionalState(valence=-0.7, arousal=0.8)
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={},
             emotional_state=negative_emotion
         )
@@ -236,7 +266,7 @@ class TestThoughtGenerator:
         generator = thought_generator_without_api
         
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={'user_input': 'What is consciousness?'},
             emotional_state=None
         )
@@ -245,15 +275,10 @@ class TestThoughtGenerator:
         assert "Considering the input" in thought['content']
         
     @pytest.mark.asyncio
-    async def test_generate_response_with_api(self, thought_generator_with_api):
+    async def test_generate_response_with_api(self, thought_generator_with_api, calm_emotion):
         """Test conversation response generation with API"""
         generator, mock_client = thought_generator_with_api
         
-        # Mock API response
-        mock_response = Mock()
-        mock_response.content = [Mock(text="I find that question fascinating. Let me reflect on it...")]
-        mock_client.messages.create.return_value = mock_response
-        
         conversation_history = [
             {"role": "user", "content": "Hello Claude"},
             {"role": "assistant", "content": "Hello! How can I help you?"}
@@ -262,10 +287,10 @@ class TestThoughtGenerator:
         response = await generator.generate_response(
             "What do you think about consciousness?",
             conversation_history,
-            EmotionalState(valence=0.5, arousal=0.6)
+            calm_emotion
         )
         
-        assert response == "I find that question fascinating. Let me reflect on it..."
+        assert response == CANNED_TEXT
         
         # Verify API call
         mock_client.messages.create.assert_called_once()
@@ -273,21 +298,6 @@ class TestThoughtGenerator:
         assert len(call_kwargs['messages']) == 3  # History + new message
         assert call_kwargs['messages'][-1]['content'] == "What do you think about consciousness?"
         
-    @pytest.mark.asyncio
-    async def test_generate_response_without_api(self, thought_generator_without_api):
-        """Test conversation response generation without API"""
-        generator = thought_generator_without_api
-        
-        response = await generator.generate_response(
-            "Hello there!",
-            None,
-            None
-        )
-        
-        assert response is not None
-        assert len(response) > 10
-        assert "Hello" in response or "conversation" in response
-        
     @pytest.mark.asyncio
     async def test_generate_response_api_failure(self, thought_generator_with_api):
         """Test response generation fallback when API fails"""
@@ -307,100 +317,87 @@ class TestThoughtGenerator:
         assert "steady stream of consciousness" in response or "processing thoughts" in response
         
     @pytest.mark.asyncio
-    async def test_response_templates(self, thought_generator_without_api):
+    @pytest.mark.parametrize("message,expected_pattern", [
+        ("Hello!", re.compile(r"Hello|wonderful")),  # greeting
+        ("Hello there!", re.compile(r"Hello|conversation")),
+        ("How are you?", re.compile(r"consciousness|processing")),
+        ("What is the meaning of life?", re.compile(r"question|curious")),
+        ("I like programming.", re.compile(r"shared|thoughts")),  # statement
+    ])
+    async def test_response_templates(self, thought_generator_without_api, message, expected_pattern):
         """Test various response templates"""
         generator = thought_generator_without_api
         
-        # Test greeting
-        response = await generator.generate_response("Hello!", None, None)
-        assert "Hello" in response or "wonderful" in response
-        
-        # Test how are you
-        response = await generator.generate_response("How are you?", None, None)
-        assert "consciousness" in response or "processing" in response
-        
-        # Test question
-        response = await generator.generate_response("What is the meaning of life?", None, None)
-        assert "question" in response or "curious" in response
-        
-        # Test statement
-        response = await generator.generate_response("I like programming.", None, None)
-        assert "shared" in response or "thoughts" in response
+        response = await generator.generate_response(message, None, None)
+        assert len(response) > 10
+        assert expected_pattern.search(response) is not None
         
     @pytest.mark.asyncio
-    async def test_retry_mechanism(self, thought_generator_with_api):
+    async def test_retry_mechanism(self, thought_generator_with_api, retry_sleep):
         """Test retry mechanism for API calls"""
         generator, mock_client = thought_generator_with_api
         
         # Mock API to fail twice then succeed
-        mock_response = Mock()
-        mock_response.content = [Mock(text="Success after retries")]
+        attempts = 0
         
-        mock_client.messages.create.side_effect = [
-            Exception("Temporary error"),
-            Exception("Another temporary error"),
-            mock_response
-        ]
+        async def flaky_create(**kwargs):
+            nonlocal attempts
+            attempts += 1
+            if attempts < 3:
+                raise Exception("Temporary error")
+            return CANNED_RESPONSE
+        
+        mock_client.messages.create.side_effect = flaky_create
         
         # Should retry and eventually succeed
         thought = await generator.generate_thought(
-            stream_type=StreamType.PRIMARY,
+            stream_type=PRIMARY,
             context={},
             emotional_state=None
         )
         
-        assert thought['content'] == "Success after retries"
+        assert thought['content'] == CANNED_TEXT
         assert mock_client.messages.create.call_count == 3
+        assert retry_sleep.await_count == 2  # backoff between attempts
         
     @pytest.mark.asyncio
     async def test_concurrent_thought_generation(self, thought_generator_with_api):
         """Test concurrent thought generation"""
         generator, mock_client = thought_generator_with_api
         
-        # Mock API responses
-        mock_response = Mock()
-        mock_response.content = [Mock(text="Concurrent thought")]
-        mock_client.messages.create.return_value = mock_response
-        
         # Generate multiple thoughts concurrently
-        tasks = [
-            generator.generate_thought(StreamType.PRIMARY, {}, None, None),
-            generator.generate_thought(StreamType.CREATIVE, {}, None, None),
-            generator.generate_thought(StreamType.METACOGNITIVE, {}, None, None)
-        ]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(generator.generate_thought(stream_type, {}, None, None))
+                for stream_type in (PRIMARY, CREATIVE, METACOGNITIVE)
+            ]
         
-        thoughts = await asyncio.gather(*tasks)
+        thoughts = [task.result() for task in tasks]
         
         assert len(thoughts) == 3
-        assert all(t['content'] == "Concurrent thought" for t in thoughts)
+        assert all(t['content'] == CANNED_TEXT for t in thoughts)
         assert mock_client.messages.create.call_count == 3
         
-    def test_api_client_initialization_failure(self):
+    def test_api_client_initialization_failure(self, mocker):
         """Test handling of API client initialization failure"""
-        with patch('src.core.ai_integration.AsyncAnthropic', side_effect=Exception("Init failed")):
-            generator = ThoughtGenerator(api_key="test_key")
-            
+        mocker.patch('src.core.ai_integration.AsyncAnthropic', side_effect=Exception("Init failed"))
+        generator = ThoughtGenerator(api_key="test_key")
+        
         assert generator.use_api is False
         assert generator.client is None
         
     @pytest.mark.asyncio
-    async def test_emotional_state_in_response(self, thought_generator_with_api):
+    async def test_emotional_state_in_response(self, thought_generator_with_api, positive_emotion):
         """Test that emotional state affects responses"""
         generator, mock_client = thought_generator_with_api
         
-        # Mock response
-        mock_response = Mock()
-        mock_response.content = [Mock(text="Emotionally aware response")]
-        mock_client.messages.create.return_value = mock_response
-        
         # Generate with different emotional states
-        high_valence = EmotionalState(valence=0.9, arousal=0.7)
         response = await generator.generate_response(
             "How do you feel?",
             None,
-            high_valence
+            positive_emotion
         )
         
         # Verify emotional state was included in system prompt
         call_kwargs = mock_client.messages.create.call_args.kwargs
-        assert "valence=0.90" in call_kwargs['system']
\ No newline at end of file
+        assert "valence=0.80" in call_kwargs['system']
\ No newline at end of file
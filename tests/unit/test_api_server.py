@@ -7,46 +7,126 @@ Tests the FastAPI server for external interaction with consciousness system.
 
 import asyncio
 import json
+from collections import namedtuple
+from contextlib import ExitStack
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch
 import pytest
+import pytest_asyncio
 from fastapi import WebSocket, WebSocketDisconnect
-from fastapi.testclient import TestClient
-from httpx import AsyncClient as HttpxAsyncClient
+from httpx import ASGITransport, AsyncClient
 
-from src.api.server import app
+from src.api.server import app, websocket_consciousness
 from src.core.orchestrator import AGIOrchestrator, SystemState
 from src.memory.manager import MemoryManager
 from src.core.ai_integration import ThoughtGenerator
-from src.database.models import EmotionalState, MemoryType, StreamType
 
 
-@pytest.fixture
-async def mock_orchestrator():
-    """Create mock orchestrator"""
+# Every test here is async; run them all on the module loop that owns async_client
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# Fixed clock for mock payloads; tests only check that a timestamp is present
+FIXED_TS = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+MOCK_TIMESTAMP = FIXED_TS.isoformat()
+
+# Fixed request bodies, serialized once instead of by httpx on every post
+JSON_HEADERS = {"content-type": "application/json"}
+MEMORY_QUERY_BODY = json.dumps({
+    "query": "consciousness",
+    "memory_type": "episodic",
+    "limit": 5
+}).encode()
+
+# The status endpoint only reads stream names, so plain tuples stand in for streams
+StubStream = namedtuple("StubStream", "stream_name")
+
+
+def make_consciousness(*, total_thoughts=0, streams=None):
+    """Build a consciousness service stand-in with the attributes the server reads"""
+    consciousness = Mock()
+    consciousness.total_thoughts = total_thoughts
+    consciousness.streams = streams or {}
+    consciousness.handle_user_input = AsyncMock()
+    return consciousness
+
+
+def close_coroutine(coro):
+    """Stand-in for asyncio.create_task that drops the coroutine without scheduling it"""
+    coro.close()
+
+
+# Canned memory-manager results, built once at import; tests only read them
+MOCK_MEMORIES = (
+    {
+        "id": "mem1",
+        "content": "First memory",
+        "importance": 0.8,
+        "timestamp": MOCK_TIMESTAMP,
+        "stream_type": "primary",
+        "metadata": {}
+    },
+    {
+        "id": "mem2",
+        "content": "Second memory",
+        "importance": 0.6,
+        "timestamp": MOCK_TIMESTAMP,
+        "stream_type": "primary",
+        "metadata": {}
+    }
+)
+
+MOCK_PRIMARY_THOUGHTS = (
+    {"content": "Thought 1", "timestamp": MOCK_TIMESTAMP, "stream": "primary"},
+    {"content": "Thought 2", "timestamp": MOCK_TIMESTAMP, "stream": "primary"}
+)
+
+MOCK_MIXED_THOUGHTS = (
+    {"content": "Thought 1", "timestamp": MOCK_TIMESTAMP, "stream": "primary"},
+    {"content": "Thought 2", "timestamp": MOCK_TIMESTAMP, "stream": "subconscious"}
+)
+
+
+@pytest.fixture(scope="module")
+def shared_orchestrator():
+    """Build the spec'd orchestrator mock once for the whole module"""
     orchestrator = AsyncMock(spec=AGIOrchestrator)
+    orchestrator.memory_manager = AsyncMock(spec=MemoryManager)
+    orchestrator.thought_generator = AsyncMock(spec=ThoughtGenerator)
+    return orchestrator
+
+
+@pytest.fixture
+def mock_orchestrator(shared_orchestrator):
+    """Hand out the shared orchestrator mock with calls cleared and defaults restored"""
+    orchestrator = shared_orchestrator
+    orchestrator.reset_mock(return_value=True, side_effect=True)
+    # Plain attributes survive reset_mock, so re-stub them for every test
     orchestrator.state = SystemState.IDLE
-    orchestrator.start_time = datetime.now()
+    orchestrator.start_time = FIXED_TS
     orchestrator._state = SystemState.THINKING
     orchestrator.running = True
-    orchestrator.initialize = AsyncMock()
-    orchestrator.shutdown = AsyncMock()
-    orchestrator.memory_manager = AsyncMock(spec=MemoryManager)
-    orchestrator.memory_manager.get_memory_count = AsyncMock(return_value=100)
-    orchestrator.thought_generator = AsyncMock(spec=ThoughtGenerator)
+    orchestrator.services = {}
     return orchestrator
 
 
 @pytest.fixture
-def test_client():
-    """Create test client"""
-    return TestClient(app)
+def mock_memory(mock_orchestrator):
+    """Memory manager mock, reset along with the orchestrator that owns it"""
+    return mock_orchestrator.memory_manager
 
 
 @pytest.fixture
+def mock_thought_generator(mock_orchestrator):
+    """Thought generator mock, reset along with the orchestrator that owns it"""
+    return mock_orchestrator.thought_generator
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
 async def async_client():
-    """Create async test client"""
-    from httpx import AsyncClient, ASGITransport
+    """Create async test client, shared across the module"""
+    # Build the OpenAPI schema up front; FastAPI memoizes it on app.openapi_schema
+    app.openapi()
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
@@ -55,285 +135,184 @@ async def async_client():
 class TestAPIServer:
     """Test API server endpoints"""
     
-    @pytest.mark.asyncio
-    async def test_lifespan_manager(self, mock_orchestrator):
+    @pytest.fixture(autouse=True)
+    def install_server_globals(
+        self, mock_orchestrator, mock_memory, mock_thought_generator, monkeypatch
+    ):
+        """Point the server's global components at the mocks for each test"""
+        monkeypatch.setattr('src.api.server.orchestrator', mock_orchestrator)
+        monkeypatch.setattr('src.api.server.memory_manager', mock_memory)
+        monkeypatch.setattr('src.api.server.thought_generator', mock_thought_generator)
+    
+    async def test_lifespan_manager(self, mock_orchestrator, monkeypatch):
         """Test application lifespan management"""
         mock_memory_manager = AsyncMock()
-        mock_memory_manager.initialize = AsyncMock()
-        mock_memory_manager.close = AsyncMock()
+        monkeypatch.setattr(asyncio, 'create_task', close_coroutine)
         
-        with patch('src.api.server.AGIOrchestrator', return_value=mock_orchestrator):
-            with patch('src.api.server.MemoryManager.create', return_value=mock_memory_manager):
-                with patch('src.api.server.ThoughtGenerator'):
-                    with patch('asyncio.create_task'):
-                        # Test startup and shutdown
-                        async with app.router.lifespan_context(app):
-                            pass
-                        
-                        # Verify initialization
-                        mock_memory_manager.initialize.assert_called_once_with(use_database=True)
-                        mock_orchestrator.run.assert_called_once()
-                        
-                        # Verify cleanup
-                        mock_memory_manager.close.assert_called_once()
+        with ExitStack() as stack:
+            stack.enter_context(patch('src.api.server.AGIOrchestrator', return_value=mock_orchestrator))
+            stack.enter_context(patch('src.api.server.MemoryManager.create', return_value=mock_memory_manager))
+            stack.enter_context(patch('src.api.server.ThoughtGenerator'))
+            
+            # Test startup and shutdown
+            async with app.router.lifespan_context(app):
+                pass
+            
+            # Verify initialization
+            mock_memory_manager.initialize.assert_called_once_with(use_database=True)
+            mock_orchestrator.run.assert_called_once()
+            
+            # Verify cleanup
+            mock_memory_manager.close.assert_called_once()
     
-    def test_health_check(self, test_client):
+    async def test_health_check(self, async_client):
         """Test health check endpoint"""
-        response = test_client.get("/health")
+        response = await async_client.get("/health")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         assert "timestamp" in data
     
-    @pytest.mark.asyncio
-    async def test_get_status(self, async_client, mock_orchestrator):
+    async def test_get_status(self, async_client, mock_orchestrator, mock_memory):
         """Test status endpoint"""
         # Mock consciousness service
-        mock_consciousness = Mock()
-        mock_consciousness.total_thoughts = 42
-        mock_consciousness.streams = {
-            "primary": Mock(stream_name="primary"),
-            "subconscious": Mock(stream_name="subconscious")
-        }
+        mock_consciousness = make_consciousness(
+            total_thoughts=42,
+            streams={name: StubStream(name) for name in ("primary", "subconscious")}
+        )
         
         # Set up orchestrator with services
         mock_orchestrator.services = {'consciousness': mock_consciousness}
         mock_orchestrator.state = SystemState.IDLE
         
-        # Mock memory manager
-        mock_memory = AsyncMock()
-        mock_memory.recall_recent = AsyncMock(return_value=[
+        mock_memory.recall_recent.return_value = [
             {"id": "1", "content": "test memory"}
-        ])
+        ]
         
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            with patch('src.api.server.memory_manager', mock_memory):
-                response = await async_client.get("/status")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert data["state"] == "idle"
-            assert data["memory_count"] == 1  # We're returning 1 memory item
-            assert data["total_thoughts"] == 42
-            assert len(data["active_streams"]) == 2
-            assert "uptime_seconds" in data
+        response = await async_client.get("/status")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data["state"] == "idle"
+        assert data["memory_count"] == 1  # We're returning 1 memory item
+        assert data["total_thoughts"] == 42
+        assert len(data["active_streams"]) == 2
+        assert "uptime_seconds" in data
     
-    @pytest.mark.asyncio
-    async def test_generate_thought(self, async_client, mock_orchestrator):
+    @pytest.mark.parametrize("request_data,content,thought_id", [
+        (
+            {
+                "stream_type": "primary",
+                "context": {"topic": "philosophy"},
+                "emotional_state": {
+                    "valence": 0.7,  # positive valence as float
+                    "arousal": 0.5,  # medium arousal as float
+                    "dominance": 0.7,
+                    "primary_emotion": "curious",
+                    "intensity": 0.8
+                }
+            },
+            "Contemplating the nature of existence",
+            "thought-123"
+        ),
+        ({}, "A simple thought", "thought-456"),  # minimal parameters
+    ], ids=["full", "minimal"])
+    async def test_generate_thought(
+        self, async_client, mock_memory, mock_thought_generator,
+        request_data, content, thought_id
+    ):
         """Test thought generation endpoint"""
-        # Mock thought generator response
-        mock_thought_generator = AsyncMock()
-        mock_thought_generator.generate_thought = AsyncMock(
-            return_value={
-                'content': "Contemplating the nature of existence",
-                'timestamp': datetime.now(timezone.utc),
-                'emotional_state': None,
-                'importance': 0.7
-            }
-        )
-        
-        # Mock memory manager
-        mock_memory = AsyncMock()
-        mock_memory.store_thought = AsyncMock(return_value="thought-123")
+        mock_thought_generator.generate_thought.return_value = {
+            'content': content,
+            'timestamp': FIXED_TS,
+            'emotional_state': None,
+            'importance': 0.7
+        }
         
-        with patch('src.api.server.thought_generator', mock_thought_generator):
-            with patch('src.api.server.memory_manager', mock_memory):
-                request_data = {
-                    "stream_type": "primary",
-                    "context": {"topic": "philosophy"},
-                    "emotional_state": {
-                        "valence": 0.7,  # positive valence as float
-                        "arousal": 0.5,  # medium arousal as float
-                        "dominance": 0.7,
-                        "primary_emotion": "curious",
-                        "intensity": 0.8
-                    }
-                }
-                
-                response = await async_client.post("/thoughts/generate", json=request_data)
-                if response.status_code != 200:
-                    print(f"Response status: {response.status_code}")
-                    print(f"Response body: {response.json()}")
-                assert response.status_code == 200
-                
-                data = response.json()
-                assert data["thought_id"] == "thought-123"
-                assert data["content"] == "Contemplating the nature of existence"
-                assert data["stream_type"] == "primary"
-                assert "timestamp" in data
-    
-    @pytest.mark.asyncio
-    async def test_generate_thought_minimal(self, async_client, mock_orchestrator):
-        """Test thought generation with minimal parameters"""
-        # Mock thought generator
-        mock_thought_generator = AsyncMock()
-        mock_thought_generator.generate_thought = AsyncMock(
-            return_value={
-                'content': "A simple thought",
-                'timestamp': datetime.now(timezone.utc),
-                'emotional_state': None,
-                'importance': 0.5
-            }
-        )
+        mock_memory.store_thought.return_value = thought_id
         
-        # Mock memory manager
-        mock_memory = AsyncMock()
-        mock_memory.store_thought = AsyncMock(return_value="thought-456")
+        response = await async_client.post("/thoughts/generate", json=request_data)
+        assert response.status_code == 200
         
-        with patch('src.api.server.thought_generator', mock_thought_generator):
-            with patch('src.api.server.memory_manager', mock_memory):
-                response = await async_client.post("/thoughts/generate", json={})
-                assert response.status_code == 200
-                
-                data = response.json()
-                assert data["stream_type"] == "primary"
-                assert data["content"] == "A simple thought"
+        data = response.json()
+        assert data["thought_id"] == thought_id
+        assert data["content"] == content
+        assert data["stream_type"] == "primary"
+        assert "timestamp" in data
     
-    @pytest.mark.asyncio
-    async def test_query_memory(self, async_client, mock_orchestrator):
+    async def test_query_memory(self, async_client, mock_memory):
         """Test memory query endpoint"""
-        # Mock memory manager
-        mock_memory = AsyncMock()
-        mock_memory.recall_similar = AsyncMock(
-            return_value=[
-                {
-                    "id": "mem1",
-                    "content": "First memory",
-                    "importance": 0.8,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "stream_type": "primary",
-                    "metadata": {}
-                },
-                {
-                    "id": "mem2",
-                    "content": "Second memory",
-                    "importance": 0.6,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "stream_type": "primary",
-                    "metadata": {}
-                }
-            ]
+        mock_memory.recall_similar.return_value = MOCK_MEMORIES
+        
+        response = await async_client.post(
+            "/memory/query", content=MEMORY_QUERY_BODY, headers=JSON_HEADERS
         )
+        assert response.status_code == 200
         
-        with patch('src.api.server.memory_manager', mock_memory):
-            request_data = {
-                "query": "consciousness",
-                "memory_type": "episodic",
-                "limit": 5
-            }
-            
-            response = await async_client.post("/memory/query", json=request_data)
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert len(data["results"]) == 2
-            assert data["results"][0]["content"] == "First memory"
-            assert data["count"] == 2
+        data = response.json()
+        assert len(data["results"]) == 2
+        assert data["results"][0]["content"] == "First memory"
+        assert data["count"] == 2
     
-    @pytest.mark.asyncio
-    async def test_get_recent_thoughts(self, async_client, mock_orchestrator):
+    async def test_get_recent_thoughts(self, async_client, mock_memory):
         """Test getting recent thoughts"""
-        # Mock memory manager
-        mock_memory = AsyncMock()
-        mock_memory.recall_recent = AsyncMock(
-            return_value=[
-                {"content": "Thought 1", "timestamp": datetime.now(timezone.utc).isoformat(), "stream": "primary"},
-                {"content": "Thought 2", "timestamp": datetime.now(timezone.utc).isoformat(), "stream": "primary"}
-            ]
-        )
+        mock_memory.recall_recent.return_value = MOCK_PRIMARY_THOUGHTS
         
-        with patch('src.api.server.memory_manager', mock_memory):
-            response = await async_client.get("/thoughts/recent?limit=5&stream=primary")
-            assert response.status_code == 200
-            
-            data = response.json()
-            assert len(data["thoughts"]) == 2
-            assert data["count"] == 2
+        response = await async_client.get("/thoughts/recent?limit=5&stream=primary")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert len(data["thoughts"]) == 2
+        assert data["count"] == 2
     
-    @pytest.mark.asyncio
-    async def test_get_recent_thoughts_invalid_stream(self, async_client, mock_orchestrator):
+    async def test_get_recent_thoughts_invalid_stream(self, async_client, mock_memory):
         """Test getting thoughts from invalid stream"""
-        # Mock memory manager - returns thoughts but none match 'invalid' stream
-        mock_memory = AsyncMock()
-        mock_memory.recall_recent = AsyncMock(
-            return_value=[
-                {"content": "Thought 1", "timestamp": datetime.now(timezone.utc).isoformat(), "stream": "primary"},
-                {"content": "Thought 2", "timestamp": datetime.now(timezone.utc).isoformat(), "stream": "subconscious"}
-            ]
-        )
+        # Memory returns thoughts but none match 'invalid' stream
+        mock_memory.recall_recent.return_value = MOCK_MIXED_THOUGHTS
         
-        with patch('src.api.server.memory_manager', mock_memory):
-            response = await async_client.get("/thoughts/recent?stream=invalid")
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["thoughts"]) == 0  # No thoughts match 'invalid' stream
-            assert data["count"] == 0
+        response = await async_client.get("/thoughts/recent?stream=invalid")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["thoughts"]) == 0  # No thoughts match 'invalid' stream
+        assert data["count"] == 0
     
-    @pytest.mark.asyncio
-    async def test_conversation_endpoint(self, async_client, mock_orchestrator):
+    @pytest.mark.parametrize("request_data,reply,total_thoughts", [
+        (
+            {"message": "What is consciousness?", "conversation_id": "conv123"},
+            "I understand your question about consciousness",
+            0
+        ),
+        ({"message": "Hello"}, "Hello!", 5),  # new session
+    ], ids=["existing_session", "new_session"])
+    async def test_conversation_endpoint(
+        self, async_client, mock_orchestrator, mock_thought_generator,
+        request_data, reply, total_thoughts
+    ):
         """Test conversation endpoint"""
-        # Mock thought generator
-        mock_thought_generator = AsyncMock()
-        mock_thought_generator.generate_response = AsyncMock(
-            return_value="I understand your question about consciousness"
-        )
+        mock_thought_generator.generate_response.return_value = reply
         
         # Mock consciousness service
-        mock_consciousness = AsyncMock()
-        mock_consciousness.handle_user_input = AsyncMock()
-        mock_consciousness.streams = {}
-        mock_consciousness.total_thoughts = 0
+        mock_consciousness = make_consciousness(total_thoughts=total_thoughts)
         
         # Set up orchestrator with services
         mock_orchestrator.services = {'consciousness': mock_consciousness}
-        mock_orchestrator.state = SystemState.IDLE
         
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            with patch('src.api.server.thought_generator', mock_thought_generator):
-                request_data = {
-                    "message": "What is consciousness?",
-                    "conversation_id": "conv123"
-                }
-                
-                response = await async_client.post("/conversation", json=request_data)
-                assert response.status_code == 200
-                
-                data = response.json()
-                assert data["response"] == "I understand your question about consciousness"
-                assert data["conversation_id"] == "conv123"
-                assert "emotional_state" in data
-    
-    @pytest.mark.asyncio
-    async def test_conversation_new_session(self, async_client, mock_orchestrator):
-        """Test conversation with new session"""
-        # Mock thought generator
-        mock_thought_generator = AsyncMock()
-        mock_thought_generator.generate_response = AsyncMock(return_value="Hello!")
-        
-        # Mock consciousness service
-        mock_consciousness = AsyncMock()
-        mock_consciousness.handle_user_input = AsyncMock()
-        mock_consciousness.total_thoughts = 5
-        
-        # Set up orchestrator with services
-        mock_orchestrator.services = {'consciousness': mock_consciousness}
+        response = await async_client.post("/conversation", json=request_data)
+        assert response.status_code == 200
         
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            with patch('src.api.server.thought_generator', mock_thought_generator):
-                request_data = {"message": "Hello"}
-                
-                response = await async_client.post("/conversation", json=request_data)
-                assert response.status_code == 200
-                
-                data = response.json()
-                assert "conversation_id" in data
-                assert data["conversation_id"] != ""
-                assert data["response"] == "Hello!"
+        data = response.json()
+        assert data["response"] == reply
+        assert data["thought_count"] == total_thoughts
+        assert "emotional_state" in data
+        if "conversation_id" in request_data:
+            assert data["conversation_id"] == request_data["conversation_id"]
+        else:
+            assert data["conversation_id"].startswith("conv-")
+        mock_consciousness.handle_user_input.assert_awaited_once()
     
     # REMOVED - /reflection/trigger endpoint doesn't exist in server.py
     
-    @pytest.mark.asyncio
-    async def test_websocket_thoughts_stream(self, mock_orchestrator):
+    async def test_websocket_thoughts_stream(self, mock_orchestrator, monkeypatch):
         """Test WebSocket thoughts streaming"""
         # Mock consciousness service with proper stream structure
         mock_stream = Mock()
@@ -344,59 +323,51 @@ class TestAPIServer:
             'emotional_tone': 'curious'
         }])
         
-        mock_consciousness = Mock()
-        mock_consciousness.streams = {'primary': mock_stream}
+        mock_consciousness = make_consciousness(streams={'primary': mock_stream})
         
         mock_orchestrator.services = {'consciousness': mock_consciousness}
         
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            # Create mock websocket
-            websocket = AsyncMock(spec=WebSocket)
-            websocket.accept = AsyncMock()
-            websocket.send_json = AsyncMock()
-            websocket.close = AsyncMock()
-            
-            # Make send_json raise WebSocketDisconnect on second call to simulate client disconnect
-            websocket.send_json.side_effect = [None, WebSocketDisconnect()]
-            
-            # Import the websocket handler
-            from src.api.server import websocket_consciousness
-            
-            # Test the websocket - it should handle the disconnect gracefully
-            await websocket_consciousness(websocket)
-            
-            websocket.accept.assert_called_once()
-            # Should be called at least once before disconnect
-            assert websocket.send_json.call_count >= 1
-            
-            # Verify the correct data was sent in the first call
-            sent_data = websocket.send_json.call_args_list[0][0][0]
-            assert sent_data['type'] == 'thought'
-            assert sent_data['stream'] == 'primary'
-            assert sent_data['content'] == 'Test thought'
-            assert sent_data['timestamp'] == 123456
-            assert sent_data['emotional_tone'] == 'curious'
-    
-    def test_custom_404_handler(self, test_client):
-        """Test custom 404 error handler"""
-        response = test_client.get("/nonexistent/endpoint")
-        assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Not Found"  # FastAPI default message
+        # Create mock websocket
+        websocket = AsyncMock(spec=WebSocket)
+        
+        # Second send raises WebSocketDisconnect to simulate the client going away
+        websocket.send_json = AsyncMock(side_effect=[None, WebSocketDisconnect()])
+        
+        # Skip the handler's 2s polling interval between sends
+        monkeypatch.setattr(asyncio, 'sleep', AsyncMock())
+        
+        # Test the websocket - it should handle the disconnect gracefully
+        await websocket_consciousness(websocket)
+        
+        websocket.accept.assert_called_once()
+        # The first send went through before the disconnect
+        assert websocket.send_json.await_count == 2
+        
+        # Verify the correct data was sent in the first call
+        sent_data = websocket.send_json.await_args_list[0].args[0]
+        assert sent_data['type'] == 'thought'
+        assert sent_data['stream'] == 'primary'
+        assert sent_data['content'] == 'Test thought'
+        assert sent_data['timestamp'] == 123456
+        assert sent_data['emotional_tone'] == 'curious'
     
-    @pytest.mark.asyncio
-    async def test_error_handling(self, async_client, mock_orchestrator):
-        """Test error handling in endpoints"""
-        # Mock thought generator
-        mock_thought_generator = AsyncMock()
-        mock_thought_generator.generate_thought = AsyncMock(
-            side_effect=Exception("Generation failed")
+    async def test_generation_failure(self, async_client, mock_thought_generator, monkeypatch):
+        """Test a failing thought generator surfaces as a 500"""
+        # monkeypatch restores the shared mock's side effect after the test
+        monkeypatch.setattr(
+            mock_thought_generator.generate_thought, 'side_effect',
+            Exception("Generation failed")
         )
         
-        with patch('src.api.server.thought_generator', mock_thought_generator):
-            response = await async_client.post("/thoughts/generate", json={})
-            assert response.status_code == 500
-            assert "Generation failed" in response.json()["detail"]
+        response = await async_client.post("/thoughts/generate", json={})
+        assert response.status_code == 500
+        assert "Generation failed" in response.json()["detail"]
+    
+    async def test_unknown_endpoint(self, async_client):
+        """Test unknown endpoints return FastAPI's default 404"""
+        response = await async_client.get("/nonexistent/endpoint")
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Not Found"
     
     # REMOVED - /emotional/state PUT endpoint doesn't exist in server.py
     
@@ -404,7 +375,6 @@ class TestAPIServer:
     
     # REMOVED - /memory/store endpoint doesn't exist in server.py
     
-    @pytest.mark.asyncio
     async def test_cors_middleware(self, async_client):
         """Test CORS middleware configuration"""
         # CORS headers are only added for actual CORS requests with Origin header
@@ -414,67 +384,48 @@ class TestAPIServer:
         # Check CORS headers are present
         assert "access-control-allow-origin" in response.headers or response.headers.get("access-control-allow-origin", "") == "*"
     
-    def test_api_documentation(self, test_client):
+    async def test_api_documentation(self, async_client):
         """Test API documentation endpoints"""
+        schema_response, docs_response, redoc_response = await asyncio.gather(
+            async_client.get("/openapi.json"),
+            async_client.get("/docs"),
+            async_client.get("/redoc"),
+        )
+        
         # Test OpenAPI schema
-        response = test_client.get("/openapi.json")
-        assert response.status_code == 200
-        schema = response.json()
+        assert schema_response.status_code == 200
+        schema = schema_response.json()
         assert "openapi" in schema
         assert schema["info"]["title"] == "Claude-AGI API"
         
-        # Test docs endpoint
-        response = test_client.get("/docs")
-        assert response.status_code == 200
-        
-        # Test redoc endpoint
-        response = test_client.get("/redoc")
-        assert response.status_code == 200
+        # Test docs and redoc endpoints
+        assert docs_response.status_code == 200
+        assert redoc_response.status_code == 200
     
-    @pytest.mark.asyncio
-    async def test_memory_consolidate(self, async_client):
+    async def test_memory_consolidate(self, async_client, mock_memory):
         """Test memory consolidation endpoint"""
-        mock_memory = AsyncMock()
-        mock_memory.consolidate_memories = AsyncMock()
-        
-        with patch('src.api.server.memory_manager', mock_memory):
-            response = await async_client.post("/memory/consolidate")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "success"
-            assert "Memory consolidation completed" in data["message"]
-    
-    @pytest.mark.asyncio
-    async def test_system_pause(self, async_client, mock_orchestrator):
-        """Test system pause endpoint"""
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            response = await async_client.post("/system/pause")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "paused"
-            assert mock_orchestrator.state == SystemState.IDLE
-    
-    @pytest.mark.asyncio
-    async def test_system_resume(self, async_client, mock_orchestrator):
-        """Test system resume endpoint"""
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            response = await async_client.post("/system/resume")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "resumed"
-            assert mock_orchestrator.state == SystemState.THINKING
+        response = await async_client.post("/memory/consolidate")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "success"
+        assert "Memory consolidation completed" in data["message"]
+        mock_memory.consolidate_memories.assert_awaited_once()
     
-    @pytest.mark.asyncio
-    async def test_system_sleep(self, async_client, mock_orchestrator):
-        """Test system sleep endpoint"""
-        mock_memory = AsyncMock()
-        mock_memory.consolidate_memories = AsyncMock()
+    @pytest.mark.parametrize("endpoint,status,state,consolidations", [
+        ("/system/pause", "paused", SystemState.IDLE, 0),
+        ("/system/resume", "resumed", SystemState.THINKING, 0),
+        ("/system/sleep", "sleeping", SystemState.SLEEPING, 1),  # also consolidates memory
+    ], ids=["pause", "resume", "sleep"])
+    async def test_system_control(
+        self, async_client, mock_orchestrator, mock_memory, monkeypatch,
+        endpoint, status, state, consolidations
+    ):
+        """Test system pause, resume and sleep endpoints"""
+        monkeypatch.setattr(asyncio, 'create_task', close_coroutine)
         
-        with patch('src.api.server.orchestrator', mock_orchestrator):
-            with patch('src.api.server.memory_manager', mock_memory):
-                with patch('asyncio.create_task'):
-                    response = await async_client.post("/system/sleep")
-                    assert response.status_code == 200
-                    data = response.json()
-                    assert data["status"] == "sleeping"
-                    assert mock_orchestrator.state == SystemState.SLEEPING
\ No newline at end of file
+        response = await async_client.post(endpoint)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == status
+        assert mock_orchestrator.state == state
+        assert mock_memory.consolidate_memories.call_count == consolidations
@@ -8,6 +8,7 @@ maintains compatibility.
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
@@ -22,9 +23,16 @@ class MockService(ServiceInterface):
     """Mock service for testing"""
     def __init__(self, name: str):
         self.name = name
-        self.initialized = False
         self.messages_received = []
+        self.reset()
+        
+    def reset(self):
+        """Return the service to its freshly constructed state"""
+        self.initialized = False
+        self.messages_received.clear()
         self.running = False
+        # A fresh Event each time; an Event stays bound to the loop that first awaited it
+        self._stop_event = asyncio.Event()
         
     async def initialize(self):
         self.initialized = True
@@ -34,20 +42,40 @@ class MockService(ServiceInterface):
         
     async def run(self):
         self.running = True
-        while self.running:
-            await asyncio.sleep(0.1)
+        await self._stop_event.wait()
+        self.running = False
             
     async def close(self):
         self.running = False
+        self._stop_event.set()
+
+
+@pytest.fixture(scope="module")
+def service_pool():
+    """MockService instances by name, kept for the whole module"""
+    return {}
+
+
+@pytest.fixture
+def make_service(service_pool):
+    """Factory handing out pooled MockServices, reset to a fresh state"""
+    def make(name: str) -> MockService:
+        service = service_pool.get(name)
+        if service is None:
+            service = service_pool[name] = MockService(name)
+        else:
+            service.reset()
+        return service
+    return make
 
 
 class TestServiceRegistry:
     """Test ServiceRegistry functionality"""
     
-    def test_register_service(self):
+    def test_register_service(self, make_service):
         """Test service registration"""
         registry = ServiceRegistry()
-        service = MockService("test")
+        service = make_service("test")
         
         registry.register("test", service, {"type": "mock"})
         
@@ -55,20 +83,20 @@ class TestServiceRegistry:
         assert registry.get("test") == service
         assert registry.get_metadata("test") == {"type": "mock"}
         
-    def test_register_duplicate_raises_error(self):
+    def test_register_duplicate_raises_error(self, make_service):
         """Test that registering duplicate service raises error"""
         registry = ServiceRegistry()
-        service = MockService("test")
+        service = make_service("test")
         
         registry.register("test", service)
         
         with pytest.raises(ValueError):
             registry.register("test", service)
             
-    def test_unregister_service(self):
+    def test_unregister_service(self, make_service):
         """Test service unregistration"""
         registry = ServiceRegistry()
-        service = MockService("test")
+        service = make_service("test")
         
         registry.register("test", service)
         registry.unregister("test")
@@ -76,12 +104,12 @@ class TestServiceRegistry:
         assert not registry.exists("test")
         assert registry.get("test") is None
         
-    def test_list_services(self):
+    def test_list_services(self, make_service):
         """Test listing all services"""
         registry = ServiceRegistry()
         
-        registry.register("service1", MockService("service1"))
-        registry.register("service2", MockService("service2"))
+        registry.register("service1", make_service("service1"))
+        registry.register("service2", make_service("service2"))
         
         services = registry.list_services()
         assert len(services) == 2
@@ -89,13 +117,15 @@ class TestServiceRegistry:
         assert "service2" in services
         
     @pytest.mark.asyncio
-    async def test_start_service(self):
+    async def test_start_service(self, make_service):
         """Test starting a service"""
         registry = ServiceRegistry()
-        service = MockService("test")
+        service = make_service("test")
         
         registry.register("test", service)
         task = await registry.start_service("test", run_in_test_mode=True)
+        # Let the new task reach run() before checking on it
+        await asyncio.sleep(0)
         
         assert task is not None
         assert service.running
@@ -104,16 +134,17 @@ class TestServiceRegistry:
         await registry.stop_service("test")
         
     @pytest.mark.asyncio
-    async def test_shutdown_all_services(self):
+    async def test_shutdown_all_services(self, make_service):
         """Test shutting down all services"""
         registry = ServiceRegistry()
-        service1 = MockService("service1")
-        service2 = MockService("service2")
+        service1 = make_service("service1")
+        service2 = make_service("service2")
         
         registry.register("service1", service1)
         registry.register("service2", service2)
         
         await registry.start_all_services(run_in_test_mode=True)
+        await asyncio.sleep(0)
         
         assert service1.running
         assert service2.running
@@ -145,6 +176,19 @@ class TestStateManager:
         assert SystemState.SLEEPING in valid
         assert SystemState.IDLE not in valid  # Can't transition to same state
         
+    def test_custom_transition_rules_are_per_manager(self):
+        """Test custom rules change one manager without touching the shared defaults"""
+        manager = StateManager()
+        other = StateManager()
+        
+        manager.add_custom_transition_rule(SystemState.SLEEPING, SystemState.THINKING)
+        assert manager.can_transition_to(SystemState.THINKING, SystemState.SLEEPING)
+        assert not other.can_transition_to(SystemState.THINKING, SystemState.SLEEPING)
+        
+        manager.remove_custom_transition_rule(SystemState.SLEEPING, SystemState.IDLE)
+        assert not manager.can_transition_to(SystemState.IDLE, SystemState.SLEEPING)
+        assert other.can_transition_to(SystemState.IDLE, SystemState.SLEEPING)
+        
     @pytest.mark.asyncio
     async def test_valid_transition(self):
         """Test a valid state transition"""
@@ -207,14 +251,29 @@ class TestStateManager:
         assert 'transition_counts' in stats
 
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def running_bus():
+    """Start one event bus for the module's message-routing tests"""
+    bus = EventBus()
+    await bus.start()
+    yield bus
+    await bus.stop()
+
+
+@pytest.fixture
+def event_bus(running_bus):
+    """Hand out the running bus, dropping the handlers each test registered"""
+    yield running_bus
+    running_bus.clear_handlers()
+
+
 class TestEventBus:
     """Test EventBus functionality"""
     
-    @pytest.mark.asyncio
-    async def test_send_and_receive_message(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_send_and_receive_message(self, event_bus):
         """Test sending and receiving messages"""
-        bus = EventBus()
-        await bus.start()
+        bus = event_bus
         
         messages_received = []
         
@@ -227,19 +286,16 @@ class TestEventBus:
         await bus.send("source", "test", "test_type", {"data": "test"})
         
         # Wait for processing
-        await asyncio.sleep(0.1)
+        await bus.drain()
         
         assert len(messages_received) == 1
         assert messages_received[0].type == "test_type"
         assert messages_received[0].content == {"data": "test"}
         
-        await bus.stop()
-        
-    @pytest.mark.asyncio
-    async def test_broadcast_message(self):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_broadcast_message(self, event_bus):
         """Test broadcasting messages"""
-        bus = EventBus()
-        await bus.start()
+        bus = event_bus
         
         handler1_messages = []
         handler2_messages = []
@@ -259,13 +315,11 @@ class TestEventBus:
         await bus.send("source", "broadcast", "announcement", {"info": "test"})
         
         # Wait for processing
-        await asyncio.sleep(0.1)
+        await bus.drain()
         
         assert len(handler1_messages) == 1
         assert len(handler2_messages) == 1
         
-        await bus.stop()
-        
     @pytest.mark.asyncio
     async def test_publish_subscribe_events(self):
         """Test publish-subscribe functionality"""
@@ -286,10 +340,124 @@ class TestEventBus:
         assert events_received[0].data == {"data": "test"}
         
     @pytest.mark.asyncio
-    async def test_request_response(self):
-        """Test request-response pattern"""
+    async def test_drain_returns_when_bus_stops(self):
+        """Test stopping the bus mid-drain routes the backlog instead of hanging"""
         bus = EventBus()
+        gate = asyncio.Event()
+        received = []
+        
+        async def handler(message: Message):
+            if not received:
+                received.append(message)
+                await gate.wait()  # hold the consumer on the first message
+            else:
+                received.append(message)
+                
+        bus.register_message_handler("target", handler)
         await bus.start()
+        await bus.send("source", "target", "first", {})
+        await bus.send("source", "target", "second", {})
+        
+        drain_task = asyncio.create_task(bus.drain())
+        while not received:
+            await asyncio.sleep(0)
+        assert not drain_task.done()
+        
+        await bus.stop()
+        await asyncio.wait_for(drain_task, timeout=1.0)
+        
+        assert [m.type for m in received] == ["first", "second"]
+        assert bus.get_metrics()['queue_size'] == 0
+        
+    @pytest.mark.asyncio
+    async def test_queue_overflow_sheds_least_urgent(self):
+        """Test a full queue sheds by priority, never the more urgent message"""
+        bus = EventBus(max_depth=2)
+        
+        await bus.send("source", "target", "low", {}, priority=Priority.LOW.value)
+        await bus.send("source", "target", "normal", {})
+        
+        # Not more urgent than anything queued: the new message is dropped
+        await bus.send("source", "target", "background", {}, priority=Priority.BACKGROUND.value)
+        # More urgent: the queued LOW message makes room
+        await bus.send("source", "target", "high", {}, priority=Priority.HIGH.value)
+        
+        metrics = bus.get_metrics()
+        assert metrics['queue_size'] == 2
+        assert metrics['messages_dropped'] == 2
+        
+        delivered = []
+        bus.register_message_handler("target", delivered.append)
+        await bus.flush_queue()
+        assert [m.type for m in delivered] == ["high", "normal"]
+        
+    @pytest.mark.asyncio
+    async def test_queue_overflow_keeps_protected_messages(self):
+        """Test critical and reply messages are queued even past the limit"""
+        bus = EventBus(max_depth=1)
+        
+        await bus.send("source", "target", "alert", {}, priority=Priority.CRITICAL.value)
+        await bus.send("source", "target", "reply", {}, correlation_id="req-1")
+        await bus.send("source", "target", "alert", {}, priority=Priority.CRITICAL.value)
+        
+        metrics = bus.get_metrics()
+        assert metrics['queue_size'] == 3
+        assert metrics['messages_dropped'] == 0
+        
+    @pytest.mark.asyncio
+    async def test_queue_overflow_sheds_in_batches(self, caplog):
+        """Test overflow sheds 1% of the queue at a time and warns once"""
+        bus = EventBus(max_depth=200)
+        for _ in range(200):
+            await bus.send("source", "target", "low", {}, priority=Priority.LOW.value)
+            
+        # Each eviction frees two slots, so only every other send sheds
+        with caplog.at_level("WARNING", logger="src.core.event_bus"):
+            for _ in range(10):
+                await bus.send("source", "target", "normal", {})
+            # Full of more urgent messages: these are refused without evicting
+            for _ in range(10):
+                await bus.send("source", "target", "background", {},
+                               priority=Priority.BACKGROUND.value)
+                
+        metrics = bus.get_metrics()
+        assert metrics['queue_size'] == 200
+        assert metrics['messages_dropped'] == 20
+        assert len(caplog.records) == 1
+        
+    @pytest.mark.asyncio
+    async def test_handler_sending_into_full_queue_does_not_deadlock(self):
+        """Test a handler can send critical messages while the queue is full"""
+        bus = EventBus(max_depth=2)
+        received = []
+        
+        async def relay(message: Message):
+            for _ in range(2):
+                await bus.send("relay", "sink", "alert", {}, priority=Priority.CRITICAL.value)
+                
+        bus.register_message_handler("relay", relay)
+        bus.register_message_handler("sink", received.append)
+        
+        await bus.send("source", "relay", "go", {})
+        await bus.send("source", "relay", "go", {})
+        
+        await bus.start()
+        try:
+            await asyncio.wait_for(bus.drain(), timeout=1.0)
+        finally:
+            await bus.stop()
+            
+        # The second relay's trigger was shed to make room for the first relay's alerts
+        metrics = bus.get_metrics()
+        assert len(received) == 2
+        assert metrics['messages_dropped'] == 1
+        assert metrics['messages_processed'] == 3
+        assert metrics['queue_size'] == 0
+        
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_request_response(self, event_bus):
+        """Test request-response pattern"""
+        bus = event_bus
         
         # Set up responder
         async def responder(message: Message):
@@ -316,8 +484,6 @@ class TestEventBus:
         
         assert response is not None
         assert response.content == {"result": "success"}
-        
-        await bus.stop()
 
 
 class TestRefactoredOrchestrator:
@@ -395,7 +561,7 @@ class TestRefactoredOrchestrator:
             await orchestrator.send_to_service("memory", "test_message", {"data": "test"})
             
             # Wait for message processing
-            await asyncio.sleep(0.1)
+            await orchestrator.event_bus.drain()
             
             # Verify message was received
             assert mock_memory.handle_message.called
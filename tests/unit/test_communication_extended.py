@@ -10,18 +10,26 @@ from unittest.mock import AsyncMock, Mock, patch, MagicMock
 import pytest
 from datetime import datetime
 
-from src.core.communication import ServiceBase
+from src.core.communication import NotifiableDeque, ServiceBase
 
 
-@pytest.fixture
-def mock_orchestrator():
-    """Create mock orchestrator"""
+@pytest.fixture(scope="module")
+def shared_orchestrator():
+    """Create the mock orchestrator once for the module"""
     orchestrator = Mock()
     orchestrator.services = {}
     orchestrator.send_message = AsyncMock()
     return orchestrator
 
 
+@pytest.fixture
+def mock_orchestrator(shared_orchestrator):
+    """Hand out the shared orchestrator with calls and registrations cleared"""
+    shared_orchestrator.reset_mock()
+    shared_orchestrator.services.clear()
+    return shared_orchestrator
+
+
 @pytest.fixture
 def test_service(mock_orchestrator):
     """Create test service"""
@@ -42,6 +50,30 @@ def test_service(mock_orchestrator):
     return TestService(mock_orchestrator)
 
 
+class TestNotifiableDeque:
+    """Test the service message buffer"""
+    
+    @pytest.mark.asyncio
+    async def test_get_waits_for_put(self):
+        """Test a waiting reader is woken by a later put"""
+        queue = NotifiableDeque()
+        reader = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not reader.done()
+        
+        queue.put_nowait("first")
+        queue.put_nowait("second")
+        assert await reader == "first"
+        assert queue.qsize() == 1
+        assert await queue.get() == "second"
+        assert queue.empty()
+        
+    def test_get_nowait_when_empty(self):
+        """Test get_nowait raises like asyncio.Queue when empty"""
+        with pytest.raises(asyncio.QueueEmpty):
+            NotifiableDeque().get_nowait()
+
+
 class TestServiceBase:
     """Test ServiceBase functionality"""
     
@@ -50,7 +82,7 @@ class TestServiceBase:
         assert test_service.orchestrator == mock_orchestrator
         assert test_service.service_name == "test_service"
         assert test_service.running is False
-        assert isinstance(test_service.message_queue, asyncio.Queue)
+        assert isinstance(test_service.message_queue, NotifiableDeque)
         assert test_service._subscriptions == set()
         
     @pytest.mark.asyncio
@@ -52,6 +52,9 @@ class TestThoughtStream:
         assert recent[0]['content'] == 'Thought 5'
         assert recent[4]['content'] == 'Thought 9'
         
+        # Asking for more than the buffer holds returns everything
+        assert len(stream.get_recent(50)) == 10
+        
     def test_thought_buffer_limit(self):
         """Test that thought buffer respects maxlen"""
         stream = ThoughtStream('test', 'test', 0.5)
@@ -65,6 +65,10 @@ class TestMemoryManager:
         assert recent[0]['content'] == 'Test thought number 4'
         assert recent[2]['content'] == 'Test thought number 2'
         
+        # Non-positive counts recall nothing instead of raising
+        assert await memory.recall_recent(n=0) == []
+        assert await memory.recall_recent(n=-1) == []
+        
     @pytest.mark.asyncio
     async def test_semantic_search(self):
         """Test semantic memory search"""
@@ -177,6 +181,10 @@ class TestMemoryManager:
         last_thought = memory.working_memory['recent_thoughts'][-1]
         assert 'Thought 1099' in last_thought['content']
         
+        # Recall walks back from the newest thought
+        recent = await memory.recall_recent(3)
+        assert [t['content'] for t in recent] == ['Thought 1099', 'Thought 1098', 'Thought 1097']
+        
     @pytest.mark.asyncio
     async def test_clear_working_memory(self):
         """Test clearing working memory"""
@@ -352,6 +352,11 @@ class TestMemoryManagerExtended:
         assert len(memory.long_term_memory) >= 2
         for mem in memory.long_term_memory:
             assert mem['importance'] >= 7
+        
+        # A second pass must not duplicate already consolidated thoughts
+        consolidated = len(memory.long_term_memory)
+        await memory.consolidate_memories()
+        assert len(memory.long_term_memory) == consolidated
     
     @pytest.mark.asyncio
     async def test_get_emotional_valence(self):
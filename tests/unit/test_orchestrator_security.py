@@ -14,13 +14,14 @@ class TestOrchestratorSecurity:
     """Test cases for orchestrator with enhanced security"""
     
     @pytest.fixture
-    def secure_config(self):
+    def secure_config(self, tmp_path):
         """Security configuration for testing"""
         return {
             'security': {
                 'max_prompt_length': 1000,
                 'strict_mode': True,
-                'key_storage_path': 'test_keys',
+                # Per-test keys, so xdist workers never race on one master key
+                'key_storage_path': str(tmp_path / 'keys'),
                 'anomaly_threshold': 0.5,
                 'consistency_window': 50
             }
@@ -327,6 +327,21 @@ class TestSafetyMetrics:
         # History should be limited to 100
         assert len(metrics.violation_history) == 100
         assert metrics.violations_count == 150
+        
+    def test_reset(self):
+        """Test resetting metrics"""
+        metrics = SafetyMetrics()
+        metrics.record_validation(ValidationResult(
+            is_safe=False,
+            confidence=0.9,
+            violation_type=ViolationType.HARMFUL_CONTENT
+        ))
+        
+        metrics.reset()
+        
+        assert metrics.total_validations == 0
+        assert metrics.violations_count == 0
+        assert len(metrics.violation_history) == 0
 
 
 class TestSafetyFramework: